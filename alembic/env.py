@@ -4,6 +4,7 @@ import sys
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy import text
 
 from alembic import context
 
@@ -14,7 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from app.db.base import Base
 from app.models.user import User, Detection
 from app.models.site import Site
-from app.models.tracking import TrackingEvent
+from app.models.tracking import TrackingEvent, SiteDailyUserAgent, TrackingEventDaily
 from app.models.ip_ranges import AIBotIPRange, IPRangeUpdateLog
 
 # this is the Alembic Config object, which provides
@@ -23,9 +24,22 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# Skipped when the app runs migrations in-process on its own connection
+# (app.utils.migrations), so the app's logging configuration is kept.
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
+# Advisory lock held for the whole upgrade transaction, so app workers starting
+# together and the deploy step's `alembic upgrade head` run one after another
+MIGRATION_LOCK_KEY = 0x6d69_6772_6174_65  # 'migrate'
+
+
+def lock_migrations(connection) -> None:
+    """Wait for other upgrades to finish; the lock is released when the transaction ends."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 target_metadata = Base.metadata
@@ -69,6 +83,18 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # Connection handed over by the app when it runs migrations in-process
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            lock_migrations(connection)
+            context.run_migrations()
+        return
+    
     # Use environment variable for database URL
     from app.core.config import settings
     
@@ -87,6 +113,7 @@ def run_migrations_online() -> None:
         )
 
         with context.begin_transaction():
+            lock_migrations(connection)
             context.run_migrations()
 
 
@@ -0,0 +1,40 @@
+"""Add unique (bot_name, ip_address) constraint to ai_bot_ip_ranges
+
+Revision ID: 3b7e5c1d9a42
+Revises: fbedc40a981e
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e5c1d9a42'
+down_revision: Union[str, Sequence[str], None] = 'fbedc40a981e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicate (bot_name, ip_address) rows, keeping an active row and then the oldest one
+    op.execute("""
+        DELETE FROM ai_bot_ip_ranges a
+        USING ai_bot_ip_ranges b
+        WHERE a.bot_name = b.bot_name
+          AND a.ip_address = b.ip_address
+          AND (b.is_active > a.is_active OR (b.is_active = a.is_active AND b.id < a.id))
+    """)
+    op.create_unique_constraint(
+        'uq_ai_bot_ip_ranges_bot_name_ip_address',
+        'ai_bot_ip_ranges',
+        ['bot_name', 'ip_address']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_ai_bot_ip_ranges_bot_name_ip_address', 'ai_bot_ip_ranges', type_='unique')
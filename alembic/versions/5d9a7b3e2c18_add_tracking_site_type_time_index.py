@@ -0,0 +1,33 @@
+"""Add (site_id, event_type, timestamp DESC) index to tracking_events
+
+Revision ID: 5d9a7b3e2c18
+Revises: 8c2f4e6a1d73
+Create Date: 2026-10-16 12:26:53.104887
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a7b3e2c18'
+down_revision: Union[str, Sequence[str], None] = '8c2f4e6a1d73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tracking_site_type_time',
+        'tracking_events',
+        ['site_id', 'event_type', sa.text('timestamp DESC'), sa.text('id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tracking_site_type_time', table_name='tracking_events')
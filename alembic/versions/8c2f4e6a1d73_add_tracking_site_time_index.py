@@ -0,0 +1,28 @@
+"""Add (site_id, timestamp) index to tracking_events
+
+Revision ID: 8c2f4e6a1d73
+Revises: 3b7e5c1d9a42
+Create Date: 2026-10-16 11:04:17.552930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2f4e6a1d73'
+down_revision: Union[str, Sequence[str], None] = '3b7e5c1d9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tracking_site_time', 'tracking_events', ['site_id', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tracking_site_time', table_name='tracking_events')
@@ -0,0 +1,34 @@
+"""Add (site_id, is_ai_bot, timestamp DESC) index to tracking_events
+
+Revision ID: 9f4b2d6e8a31
+Revises: c2e8f5a7b914
+Create Date: 2026-10-16 15:02:11.482613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f4b2d6e8a31'
+down_revision: Union[str, Sequence[str], None] = 'c2e8f5a7b914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tracking_site_bot_time',
+        'tracking_events',
+        ['site_id', 'is_ai_bot', sa.text('timestamp DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_using='btree'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tracking_site_bot_time', table_name='tracking_events')
@@ -0,0 +1,85 @@
+"""Partition tracking_events by month on timestamp
+
+Revision ID: a4e7c1b9f352
+Revises: f3c7a2e9d164
+Create Date: 2026-10-16 16:48:13.905227
+
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c1b9f352'
+down_revision: Union[str, Sequence[str], None] = 'f3c7a2e9d164'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Indexes of tracking_events, recreated on the new table
+INDEXES = [
+    ('ix_tracking_events_id', 'id'),
+    ('ix_tracking_events_site_id', 'site_id'),
+    ('ix_tracking_events_event_type', 'event_type'),
+    ('ix_tracking_site_time', 'site_id, timestamp'),
+    ('ix_tracking_site_type_time', 'site_id, event_type, timestamp DESC, id DESC'),
+    ('ix_tracking_site_bot_time', 'site_id, is_ai_bot, timestamp DESC, id DESC'),
+]
+
+
+def _next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _swap_in(new_table: str, primary_key: str) -> None:
+    """Copy tracking_events into `new_table` and put it in its place, keeping the id sequence."""
+    op.execute(f"INSERT INTO {new_table} SELECT * FROM tracking_events")
+    op.execute("ALTER SEQUENCE tracking_events_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE tracking_events")
+    op.execute(f"ALTER TABLE {new_table} RENAME TO tracking_events")
+    op.execute(f"ALTER TABLE tracking_events ADD CONSTRAINT tracking_events_pkey PRIMARY KEY ({primary_key})")
+    op.execute("ALTER SEQUENCE tracking_events_id_seq OWNED BY tracking_events.id")
+    for name, columns in INDEXES:
+        op.execute(f"CREATE INDEX {name} ON tracking_events ({columns})")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The partition key cannot be NULL
+    op.execute("UPDATE tracking_events SET timestamp = coalesce(created_at, now()) WHERE timestamp IS NULL")
+    
+    op.execute("""
+        CREATE TABLE tracking_events_partitioned (LIKE tracking_events INCLUDING DEFAULTS)
+        PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("ALTER TABLE tracking_events_partitioned ALTER COLUMN timestamp SET NOT NULL")
+    
+    # Monthly partitions from the oldest stored event to two months ahead,
+    # plus a default partition for anything outside them
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT (min(timestamp) AT TIME ZONE 'UTC')::date FROM tracking_events"
+    )).scalar()
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(oldest, this_month).replace(day=1) if oldest else this_month
+    end = _next_month(_next_month(_next_month(this_month)))
+    while month < end:
+        next_month = _next_month(month)
+        op.execute(
+            f"CREATE TABLE tracking_events_{month:%Y%m} PARTITION OF tracking_events_partitioned "
+            f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{next_month} 00:00:00+00')"
+        )
+        month = next_month
+    op.execute("CREATE TABLE tracking_events_default PARTITION OF tracking_events_partitioned DEFAULT")
+    
+    _swap_in('tracking_events_partitioned', 'id, timestamp')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("CREATE TABLE tracking_events_plain (LIKE tracking_events INCLUDING DEFAULTS)")
+    op.execute("ALTER TABLE tracking_events_plain ALTER COLUMN timestamp DROP NOT NULL")
+    
+    # Dropping the partitioned table drops its partitions
+    _swap_in('tracking_events_plain', 'id')
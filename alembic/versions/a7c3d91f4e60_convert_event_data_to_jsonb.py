@@ -0,0 +1,39 @@
+"""Convert tracking_events.event_data to JSONB
+
+Revision ID: a7c3d91f4e60
+Revises: e41b6f0c8a25
+Create Date: 2026-10-16 14:02:09.613284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3d91f4e60'
+down_revision: Union[str, Sequence[str], None] = 'e41b6f0c8a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('tracking_events', 'event_data',
+        existing_type=sa.JSON(),
+        type_=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='event_data::jsonb'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('tracking_events', 'event_data',
+        existing_type=postgresql.JSONB(),
+        type_=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='event_data::json'
+    )
@@ -0,0 +1,57 @@
+"""Add tracking_events_daily rollup, replacing site_daily_mv
+
+Revision ID: b6d1e9a4c357
+Revises: 9f4b2d6e8a31
+Create Date: 2026-10-16 15:31:08.217340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d1e9a4c357'
+down_revision: Union[str, Sequence[str], None] = '9f4b2d6e8a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tracking_events_daily',
+        sa.Column('site_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('is_ai_bot', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('site_id', 'day', 'event_type', 'is_ai_bot')
+    )
+    # Backfill from the stored events, by UTC day like the ingest path
+    op.execute("""
+        INSERT INTO tracking_events_daily (site_id, day, event_type, is_ai_bot, count)
+        SELECT site_id, (timestamp AT TIME ZONE 'UTC')::date, event_type, is_ai_bot, count(*)
+        FROM tracking_events
+        WHERE is_ai_bot IS NOT NULL
+        GROUP BY site_id, (timestamp AT TIME ZONE 'UTC')::date, event_type, is_ai_bot
+    """)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS site_daily_mv")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW site_daily_mv AS
+        SELECT site_id, date(timestamp) AS day, is_ai_bot, event_type,
+               count(*) AS events, current_date AS refreshed_day
+        FROM tracking_events
+        WHERE timestamp < current_date
+        GROUP BY site_id, date(timestamp), is_ai_bot, event_type
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX ux_site_daily_mv
+        ON site_daily_mv (site_id, day, is_ai_bot, event_type)
+    """)
+    op.drop_table('tracking_events_daily')
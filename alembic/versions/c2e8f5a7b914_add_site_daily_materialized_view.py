@@ -0,0 +1,40 @@
+"""Add site_daily_mv materialized view
+
+Revision ID: c2e8f5a7b914
+Revises: a7c3d91f4e60
+Create Date: 2026-10-16 14:47:22.905176
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f5a7b914'
+down_revision: Union[str, Sequence[str], None] = 'a7c3d91f4e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW site_daily_mv AS
+        SELECT site_id, date(timestamp) AS day, is_ai_bot, event_type,
+               count(*) AS events, current_date AS refreshed_day
+        FROM tracking_events
+        WHERE timestamp < current_date
+        GROUP BY site_id, date(timestamp), is_ai_bot, event_type
+    """)
+    # A unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX ux_site_daily_mv
+        ON site_daily_mv (site_id, day, is_ai_bot, event_type)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS site_daily_mv")
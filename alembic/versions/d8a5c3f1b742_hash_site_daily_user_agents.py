@@ -0,0 +1,54 @@
+"""Store site_daily_user_agents as bigint User-Agent hashes
+
+Revision ID: d8a5c3f1b742
+Revises: b6d1e9a4c357
+Create Date: 2026-10-16 15:54:40.630918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a5c3f1b742'
+down_revision: Union[str, Sequence[str], None] = 'b6d1e9a4c357'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_table('site_daily_user_agents')
+    op.create_table('site_daily_user_agents',
+        sa.Column('site_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_agent_hash', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('site_id', 'day', 'user_agent_hash')
+    )
+    # Backfill from the events already stored; same hash as the ingest path
+    op.execute("""
+        INSERT INTO site_daily_user_agents (site_id, day, user_agent_hash)
+        SELECT DISTINCT site_id, (timestamp AT TIME ZONE 'UTC')::date,
+               ('x' || substr(md5(user_agent), 1, 16))::bit(64)::bigint
+        FROM tracking_events
+        WHERE user_agent IS NOT NULL AND timestamp IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('site_daily_user_agents')
+    op.create_table('site_daily_user_agents',
+        sa.Column('site_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_agent', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('site_id', 'day', 'user_agent')
+    )
+    op.execute("""
+        INSERT INTO site_daily_user_agents (site_id, day, user_agent)
+        SELECT DISTINCT site_id, (timestamp AT TIME ZONE 'UTC')::date, user_agent
+        FROM tracking_events
+        WHERE user_agent IS NOT NULL AND timestamp IS NOT NULL
+    """)
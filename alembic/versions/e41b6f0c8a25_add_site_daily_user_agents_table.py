@@ -0,0 +1,40 @@
+"""Add site_daily_user_agents rollup table
+
+Revision ID: e41b6f0c8a25
+Revises: 5d9a7b3e2c18
+Create Date: 2026-10-16 13:08:31.772415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b6f0c8a25'
+down_revision: Union[str, Sequence[str], None] = '5d9a7b3e2c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('site_daily_user_agents',
+        sa.Column('site_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_agent', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('site_id', 'day', 'user_agent')
+    )
+    # Backfill from the events already stored
+    op.execute("""
+        INSERT INTO site_daily_user_agents (site_id, day, user_agent)
+        SELECT DISTINCT site_id, (timestamp AT TIME ZONE 'UTC')::date, user_agent
+        FROM tracking_events
+        WHERE user_agent IS NOT NULL AND timestamp IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('site_daily_user_agents')
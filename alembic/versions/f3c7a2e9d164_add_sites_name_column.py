@@ -0,0 +1,33 @@
+"""Add sites.name column if missing
+
+Revision ID: f3c7a2e9d164
+Revises: d8a5c3f1b742
+Create Date: 2026-10-16 16:20:47.358102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7a2e9d164'
+down_revision: Union[str, Sequence[str], None] = 'd8a5c3f1b742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases set up before Alembic may already have the column; a constant
+    # default is stored as metadata, so adding it does not rewrite the table
+    op.execute("ALTER TABLE sites ADD COLUMN IF NOT EXISTS name VARCHAR NOT NULL DEFAULT ''")
+    op.execute("UPDATE sites SET name = domain WHERE name = ''")
+    # New rows get their name from the application
+    op.alter_column('sites', 'name', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sites', 'name')
@@ -55,10 +55,19 @@ async def get_site_visits(
     limit: int = Query(default=50, ge=1, le=100, description="Number of visits to return"),
     offset: int = Query(default=0, ge=0, description="Offset for pagination"),
     bot_type: str = Query(default=None, description="Filter by bot type"),
+    before_timestamp: Optional[datetime] = Query(default=None, description="Cursor timestamp from the previous page"),
+    before_id: Optional[int] = Query(default=None, description="Cursor id from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get recent visits for a specific site."""
+    # The cursor is the (timestamp, id) of the previous page's last visit; half of it is no position
+    if (before_timestamp is None) != (before_id is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before_timestamp and before_id must be given together"
+        )
+    
     # Verify user owns the site
     site_service = SiteService(db)
     site = site_service.get_site_by_site_id(site_id)
@@ -72,7 +81,10 @@ async def get_site_visits(
     tracking_service = TrackingEventService(db)
     
     # Get visits (page_view events) with optional bot type filter
-    visits = tracking_service.get_site_events_by_type(site_id, "page_view", limit, bot_type=bot_type)
+    cursor = (before_timestamp, before_id) if before_timestamp is not None else None
+    visits, next_cursor = tracking_service.get_site_events_by_type(
+        site_id, "page_view", limit, bot_type=bot_type, cursor=cursor
+    )
     
     # Format visits for dashboard - only AI bots
     formatted_visits = []
@@ -95,7 +107,11 @@ async def get_site_visits(
         "visits": formatted_visits,
         "total_count": len(formatted_visits),
         "limit": limit,
-        "offset": offset
+        "offset": offset,
+        "next_cursor": {
+            "before_timestamp": next_cursor[0].isoformat(),
+            "before_id": next_cursor[1]
+        } if next_cursor else None
     }
 
 
@@ -137,21 +153,20 @@ async def get_user_sites_for_dashboard(
 ):
     """Get user's sites with basic stats for dashboard."""
     site_service = SiteService(db)
-    tracking_service = TrackingEventService(db)
     
+    # Sites already carry their last-30-day event statistics
     sites = site_service.get_user_sites(current_user.id)
     
     sites_with_stats = []
     for site in sites:
-        stats = tracking_service.get_site_stats(site.site_id, 30)  # Last 30 days
         sites_with_stats.append({
             "id": site.id,
             "site_id": site.site_id,
             "domain": site.domain,
-            "total_events": stats["total_events"],
-            "ai_bot_events": stats["ai_bot_events"],
-            "human_events": stats["human_events"],
-            "ai_bot_percentage": stats["ai_bot_percentage"],
+            "total_events": site.total_events,
+            "ai_bot_events": site.ai_bot_events,
+            "human_events": site.human_events,
+            "ai_bot_percentage": site.ai_bot_percentage,
             "created_at": site.created_at.isoformat()
         })
     
@@ -164,7 +164,7 @@ async def start_scheduler():
 async def stop_scheduler():
     """Stop the scheduler service."""
     try:
-        scheduler_service.stop_scheduler()
+        await scheduler_service.stop_scheduler()
         
         return {
             "message": "Scheduler stopped successfully",
@@ -181,7 +181,7 @@ async def stop_scheduler():
 async def trigger_ip_update():
     """Manually trigger IP range update."""
     try:
-        scheduler_service.schedule_ip_update_now()
+        await scheduler_service.schedule_ip_update_now()
         
         return {
             "message": "IP range update triggered",
@@ -198,7 +198,7 @@ async def trigger_ip_update():
 async def trigger_chatgpt_ip_update():
     """Manually trigger ChatGPT IP update from crawlers-info.de."""
     try:
-        scheduler_service.schedule_chatgpt_ip_update_now()
+        await scheduler_service.schedule_chatgpt_ip_update_now()
         
         return {
             "message": "ChatGPT IP update triggered",
@@ -218,7 +218,7 @@ async def update_chatgpt_ips(
     """Update ChatGPT IP addresses from crawlers-info.de."""
     try:
         ip_service = IPRangeService(db)
-        result = ip_service.update_chatgpt_ips_from_crawlers_info()
+        result = await ip_service.update_chatgpt_ips_from_crawlers_info()
         
         if result['status'] == 'success':
             return {
@@ -4,7 +4,8 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
-from datetime import datetime
+from app.schemas.tracking import TrackingEventIn
+from datetime import datetime, timezone
 import json
 
 router = APIRouter()
@@ -71,17 +72,17 @@ async def get_client_page(
             
             # Save tracking event to database
             tracking_service = TrackingEventService(db)
-            event_data = {
-                'site_id': site_id,
-                'event_type': 'page_view',
-                'url': f'{request.url}',
-                'user_agent': user_agent,
-                'timestamp': datetime.now().isoformat(),
-                'title': f'Server-side detection for {site.name}',
-                'path': '/client-page'
-            }
+            event_in = TrackingEventIn(
+                site_id=site_id,
+                event_type='page_view',
+                url=f'{request.url}',
+                user_agent=user_agent,
+                timestamp=datetime.now(timezone.utc),
+                title=f'Server-side detection for {site.name}',
+                path='/client-page'
+            )
             
-            event = tracking_service.create_tracking_event(event_data, client_ip)
+            event = tracking_service.create_tracking_event(event_in, client_ip)
             if event:
                 print(f"🎯 SERVER DETECTION: Event #{event.id} saved - {bot_name} detected!")
                 print(f"📊 DETAILS: IP={client_ip} | UA={user_agent[:50]}... | Site={site.name}")
@@ -8,8 +8,8 @@ import json
 
 from app.api.deps import get_db
 from app.services.ai_detection_service import AIBotDetectionService
+from app.schemas.tracking import TrackingEventIn
 from app.services.tracking_service import TrackingEventService
-from app.models.tracking import TrackingEvent
 from app.utils.logging import log_tracking_event
 
 router = APIRouter()
@@ -48,7 +48,8 @@ async def server_detection(request: Request, db: Session = Depends(get_db)):
             # AI bot detected - save event
             tracking_service = TrackingEventService(db)
             
-            tracking_event = TrackingEvent(
+            # Written through the ingest path, so the daily rollups include it
+            tracking_service.create_batch_tracking_events([TrackingEventIn(
                 site_id=site_id,
                 event_type='server_detection',
                 url=url,
@@ -56,15 +57,8 @@ async def server_detection(request: Request, db: Session = Depends(get_db)):
                 title=f'AI Bot Detection - {bot_name}',
                 referrer=referrer,
                 user_agent=user_agent,
-                ip_address=ip_address,
-                is_ai_bot=bot_category,
-                bot_name=bot_name,
-                detection_method=detection_method,
-                timestamp=datetime.fromisoformat(data.get('timestamp', datetime.now().isoformat()))
-            )
-            
-            db.add(tracking_event)
-            db.commit()
+                timestamp=data.get('timestamp')
+            )], ip_address)
             
             # Log successful detection
             log_tracking_event(
@@ -3,11 +3,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import PlainTextResponse, Response, HTMLResponse
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 import json
+import queue
+from pydantic import ValidationError
 
 from app.api.deps import get_db
 from app.services.site_service import SiteService
+from app.schemas.tracking import TrackingEventIn, tracking_event_list_adapter
 from app.services.tracking_service import TrackingEventService
 from app.utils.logging import log_error, log_tracking_event
 from app.core.config import settings
@@ -15,6 +18,52 @@ import ipaddress
 
 router = APIRouter()
 
+def queue_full_response() -> Response:
+    """429 response for when the tracking event queue is full."""
+    return Response(
+        content=json.dumps({
+            "status": "error",
+            "message": "Too many events, please retry later"
+        }),
+        status_code=429,
+        headers={
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "POST, OPTIONS, GET",
+            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With",
+            "Content-Type": "application/json",
+            "Retry-After": "1"
+        }
+    )
+
+
+def invalid_events_response(error: ValidationError) -> Response:
+    """400 response naming the invalid fields of a tracking event body; logged as an error."""
+    # A large invalid batch repeats the same errors, the first few are enough
+    errors = [
+        {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+        for err in error.errors()[:10]
+    ]
+    
+    log_error(
+        error_message=f"Invalid tracking event data: {error.error_count()} errors",
+        error_details="; ".join(f"{err['field'] or 'body'}: {err['message']}" for err in errors)
+    )
+    
+    return Response(
+        content=json.dumps({
+            "status": "error",
+            "message": "Invalid event data",
+            "errors": errors
+        }),
+        status_code=400,
+        headers={
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "POST, OPTIONS, GET",
+            "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With",
+            "Content-Type": "application/json"
+        }
+    )
+
 
 def get_real_client_ip(request: Request) -> str:
     """
@@ -320,7 +369,8 @@ async def receive_tracking_event(
 ):
     """Receive tracking events from JavaScript snippet."""
     try:
-        data = await request.json()
+        # Parse and validate the body in one pass, straight from the raw bytes
+        event_in = TrackingEventIn.model_validate_json(await request.body())
         
         # Get client IP address
         client_ip = request.client.host
@@ -330,15 +380,19 @@ async def receive_tracking_event(
             client_ip = request.headers["x-real-ip"]
         
         # Log the event
-        print(f"Tracking event received from IP {client_ip}: {json.dumps(data, indent=2)}")
+        print(f"Tracking event received from IP {client_ip}: {event_in.model_dump_json(indent=2)}")
         
-        # Save to database with AI bot detection
+        # Queue for the database writer with AI bot detection
         tracking_service = TrackingEventService(db)
-        event = tracking_service.create_tracking_event(data, ip_address=client_ip)
+        try:
+            events = tracking_service.enqueue_tracking_events([event_in], ip_address=client_ip)
+        except queue.Full:
+            return queue_full_response()
+        event = events[0] if events else None
         
-        # Check if event was saved (only AI bots are saved)
+        # Check if event was accepted (only AI bots are saved)
         if event is None:
-            print(f"Event ignored - not an AI bot (User-Agent: {data.get('user_agent', 'unknown')})")
+            print(f"Event ignored - not an AI bot (User-Agent: {event_in.user_agent or 'unknown'})")
             return Response(
                 content=json.dumps({
                     "status": "ignored", 
@@ -356,27 +410,27 @@ async def receive_tracking_event(
         
         # Log tracking event
         log_tracking_event(
-            event_type=event.event_type,
-            site_id=event.site_id,
-            ip_address=event.ip_address,
-            user_agent=event.user_agent,
-            is_ai_bot=event.is_ai_bot is not None,
-            bot_name=event.bot_name
+            event_type=event['event_type'],
+            site_id=event['site_id'],
+            ip_address=event['ip_address'],
+            user_agent=event['user_agent'],
+            is_ai_bot=event['is_ai_bot'] is not None,
+            bot_name=event['bot_name']
         )
         
-        bot_info = f" (AI Bot: {event.bot_name})" if event.is_ai_bot else " (Human visitor)"
-        detection_info = f" [{event.detection_method}]" if event.detection_method else ""
-        print(f"Event saved to database with ID: {event.id}{bot_info}{detection_info}")
+        bot_info = f" (AI Bot: {event['bot_name']})" if event['is_ai_bot'] else " (Human visitor)"
+        detection_info = f" [{event['detection_method']}]" if event['detection_method'] else ""
+        print(f"Event accepted for saving{bot_info}{detection_info}")
         
+        # The event is queued for the background writer, not yet saved
         return Response(
             content=json.dumps({
-                "status": "success", 
-                "message": "Event received and saved", 
-                "event_id": event.id,
-                "is_ai_bot": event.is_ai_bot is not None,
-                "bot_name": event.bot_name
+                "status": "accepted", 
+                "message": "Event accepted and queued for saving", 
+                "is_ai_bot": event['is_ai_bot'] is not None,
+                "bot_name": event['bot_name']
             }),
-            status_code=200,
+            status_code=202,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "POST, OPTIONS, GET",
@@ -385,6 +439,8 @@ async def receive_tracking_event(
             }
         )
         
+    except ValidationError as e:
+        return invalid_events_response(e)
     except Exception as e:
         error_message = f"Error processing tracking event: {str(e)}"
         print(error_message)
@@ -393,7 +449,7 @@ async def receive_tracking_event(
         log_error(
             error_message=error_message,
             error_details=str(e),
-            site_id=data.get('site_id') if 'data' in locals() else None
+            site_id=event_in.site_id if 'event_in' in locals() else None
         )
         
         return Response(
@@ -432,7 +488,7 @@ async def receive_batch_tracking_events(
 ):
     """Receive batch tracking events from JavaScript snippet."""
     try:
-        data = await request.json()
+        data = tracking_event_list_adapter.validate_json(await request.body())
         
         # Get client IP address
         client_ip = request.client.host
@@ -444,26 +500,30 @@ async def receive_batch_tracking_events(
         # Log the batch events
         print(f"Batch tracking events received from IP {client_ip}: {len(data)} events")
         for event in data:
-            print(f"  - {event.get('event_type', 'unknown')}: {event.get('url', 'no url')}")
+            print(f"  - {event.event_type}: {event.url}")
         
         # Save to database with AI bot detection
         tracking_service = TrackingEventService(db)
-        events = tracking_service.create_batch_tracking_events(data, ip_address=client_ip)
+        try:
+            events = tracking_service.enqueue_tracking_events(data, ip_address=client_ip)
+        except queue.Full:
+            return queue_full_response()
         
-        ai_bot_count = sum(1 for event in events if event.is_ai_bot)
+        ai_bot_count = sum(1 for event in events if event['is_ai_bot'])
         human_count = len(events) - ai_bot_count
         
-        print(f"Batch events saved to database: {len(events)} events ({ai_bot_count} AI bots, {human_count} humans)")
+        print(f"Batch events queued for saving: {len(events)} events ({ai_bot_count} AI bots, {human_count} humans)")
         
+        # The events are queued for the background writer, not yet saved
         return Response(
             content=json.dumps({
-                "status": "success", 
-                "message": f"Received and saved {len(data)} events", 
+                "status": "accepted", 
+                "message": f"Received {len(data)} events, {len(events)} queued for saving", 
                 "events_count": len(events),
                 "ai_bot_count": ai_bot_count,
                 "human_count": human_count
             }),
-            status_code=200,
+            status_code=202,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "POST, OPTIONS, GET",
@@ -472,6 +532,8 @@ async def receive_batch_tracking_events(
             }
         )
         
+    except ValidationError as e:
+        return invalid_events_response(e)
     except Exception as e:
         error_message = f"Error processing batch tracking events: {str(e)}"
         print(error_message)
@@ -619,16 +681,16 @@ async def detect_ai_bot(
         if "request_headers" in data and isinstance(data["request_headers"], dict):
             referrer = data["request_headers"].get("referer", "")
         
-        event_data = {
-            "site_id": site_id,
-            "event_type": "api_detection",
-            "url": data.get("request_path", "/"),
-            "user_agent": user_agent,
-            "referrer": referrer,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        event_in = TrackingEventIn(
+            site_id=site_id,
+            event_type="api_detection",
+            url=data.get("request_path", "/"),
+            user_agent=user_agent,
+            referrer=referrer,
+            timestamp=datetime.now(timezone.utc)
+        )
         
-        tracking_service.create_tracking_event(event_data, ip_address=client_ip)
+        tracking_service.create_batch_tracking_events([event_in], ip_address=client_ip)
         
         # Return detection result
         return {
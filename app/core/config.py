@@ -42,6 +42,9 @@ class Settings(BaseModel):
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     
+    # Tracking events older than this are removed by the daily cleanup job
+    EVENT_RETENTION_DAYS: int = int(os.getenv("EVENT_RETENTION_DAYS", "90"))
+    
     # API URL for generating tracking scripts
     @property
     def API_URL(self) -> str:
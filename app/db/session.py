@@ -1,18 +1,31 @@
 """Database session management."""
 
+import asyncio
+import functools
+import json
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from app.core.config import settings
 
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    echo=settings.DEBUG
+    echo=settings.DEBUG,
+    # Compiled SQL per statement shape; room for every service statement in all variants
+    query_cache_size=1200,
+    # Compact JSON for JSON/JSONB columns: no whitespace, no \u escaping of non-ASCII text
+    json_serializer=functools.partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit; code that needs server-generated values refreshes explicitly
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Sessions for scheduler jobs: one per asyncio task on the scheduler loop,
+# released with SchedulerSession.remove() when the job finishes
+SchedulerSession = scoped_session(SessionLocal, scopefunc=asyncio.current_task)
 
 Base = declarative_base()
 
@@ -6,7 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import health, detections, auth, sites, tracking, dashboard, ip_ranges, public, server_code, server_detection
 from app.core.config import settings
 from app.services.scheduler_service import scheduler_service
-from app.utils.migrations import run_migrations
+from app.utils.migrations import run_migrations, ensure_event_partitions
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,6 +18,8 @@ app = FastAPI(
 # Run migrations on startup
 print("🔄 Running database migrations...")
 run_migrations()
+# This month's partition must exist before the first event, or it lands in the default one
+ensure_event_partitions()
 
 app.add_middleware(
     CORSMiddleware,
@@ -55,7 +57,7 @@ async def shutdown_event():
     print("🛑 Shutting down AI Detector API...")
     
     # Stop scheduler service
-    scheduler_service.stop_scheduler()
+    await scheduler_service.stop_scheduler()
     print("✅ Scheduler service stopped")
 
 
@@ -1,6 +1,6 @@
 """AI Bot IP Ranges model."""
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, UniqueConstraint
 from sqlalchemy.sql import func
 
 from app.db.base import Base
@@ -10,6 +10,9 @@ class AIBotIPRange(Base):
     """Model for storing AI bot IP ranges and addresses."""
 
     __tablename__ = "ai_bot_ip_ranges"
+    __table_args__ = (
+        UniqueConstraint('bot_name', 'ip_address', name='uq_ai_bot_ip_ranges_bot_name_ip_address'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     bot_name = Column(String, nullable=False, index=True)  # ChatGPT, GPTBot, etc.
@@ -1,6 +1,7 @@
 """Tracking event model."""
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Text, JSON, Index, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -11,8 +12,16 @@ class TrackingEvent(Base):
     """Tracking event model."""
 
     __tablename__ = "tracking_events"
+    __table_args__ = (
+        # Every stats query filters by site_id and a timestamp range
+        Index('ix_tracking_site_time', 'site_id', 'timestamp'),
+        # Monthly range partitions on timestamp, so retention drops whole partitions;
+        # TrackingEventService creates them ahead and drops expired ones
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The partition key must be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     site_id = Column(String, nullable=False, index=True)  # site_id from Site model
     event_type = Column(String, nullable=False, index=True)  # page_view, click, etc.
     url = Column(Text, nullable=False)
@@ -25,12 +34,77 @@ class TrackingEvent(Base):
     viewport_size = Column(String, nullable=True)
     language = Column(String, nullable=True)
     timezone = Column(String, nullable=True)
-    event_data = Column(JSON, nullable=True)  # Additional event-specific data
+    event_data = Column(JSON().with_variant(JSONB(), 'postgresql'), nullable=True)  # Additional event-specific data
     
     # AI Bot Detection
     is_ai_bot = Column(String, nullable=True)  # Bot name if detected, null if not
     bot_name = Column(String, nullable=True)  # Name of the AI bot (GPTBot, Perplexity, etc.)
     detection_method = Column(String, nullable=True)  # How bot was detected: user_agent, ip_address, both
     
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# Catch-all partition for timestamps outside the monthly partitions; created by the
+# migrations, or together with the table when it is created from metadata
+event.listen(TrackingEvent.__table__, 'after_create', DDL(
+    "CREATE TABLE IF NOT EXISTS tracking_events_default PARTITION OF tracking_events DEFAULT"
+).execute_if(dialect='postgresql'))
+
+
+def _create_monthly_partitions(target, connection, **kw):
+    """Create this month's and the upcoming partitions with the table, before any event lands in default."""
+    if connection.dialect.name != 'postgresql':
+        return
+    
+    from app.services.tracking_service import create_event_partitions
+    create_event_partitions(connection)
+
+
+event.listen(TrackingEvent.__table__, 'after_create', _create_monthly_partitions)
+
+
+# Latest events of one type for a site (dashboard visits): a backward range read
+# in (timestamp, id) order, matching the keyset cursor
+Index(
+    'ix_tracking_site_type_time',
+    TrackingEvent.site_id,
+    TrackingEvent.event_type,
+    TrackingEvent.timestamp.desc(),
+    TrackingEvent.id.desc()
+)
+
+# Latest events of one bot for a site (visits filtered by bot type), same order
+Index(
+    'ix_tracking_site_bot_time',
+    TrackingEvent.site_id,
+    TrackingEvent.is_ai_bot,
+    TrackingEvent.timestamp.desc(),
+    TrackingEvent.id.desc()
+)
+
+
+class SiteDailyUserAgent(Base):
+    """Distinct User-Agents seen per site per day (UTC), filled on ingest.
+    
+    User-Agents are stored as the first 8 bytes of their MD5 as a signed bigint,
+    so distinct counts compare fixed-width integers instead of long text.
+    """
+
+    __tablename__ = "site_daily_user_agents"
+
+    site_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    user_agent_hash = Column(BigInteger, primary_key=True)
+
+
+class TrackingEventDaily(Base):
+    """Event counts per site, day (UTC), event type and bot, maintained on ingest."""
+
+    __tablename__ = "tracking_events_daily"
+
+    site_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    event_type = Column(String, primary_key=True)
+    is_ai_bot = Column(String, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
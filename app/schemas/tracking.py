@@ -0,0 +1,32 @@
+"""Tracking event schemas."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+
+
+class TrackingEventIn(BaseModel):
+    """Tracking event as sent by the JavaScript snippet; unknown fields are ignored."""
+    site_id: str
+    event_type: str
+    url: str
+    path: Optional[str] = None
+    title: Optional[str] = None
+    referrer: Optional[str] = None
+    user_agent: Optional[str] = None
+    screen_resolution: Optional[str] = None
+    viewport_size: Optional[str] = None
+    language: Optional[str] = None
+    timezone: Optional[str] = None
+    # Sent as null by some snippets; always a dict after validation
+    data: Optional[Dict[str, Any]] = Field(None, validate_default=True)
+    timestamp: Optional[datetime] = None
+    
+    @field_validator('data')
+    @classmethod
+    def data_or_empty(cls, value: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return {} if value is None else value
+
+
+# Parses a batch request body straight from JSON bytes
+tracking_event_list_adapter = TypeAdapter(List[TrackingEventIn])
@@ -1,7 +1,10 @@
 """AI Bot Detection Service."""
 
+import functools
 import re
+import threading
 from typing import Optional, Tuple
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
 
 from app.services.ip_range_service import IPRangeService
@@ -10,7 +13,12 @@ from app.services.ip_range_service import IPRangeService
 class AIBotDetectionService:
     """Service for detecting AI bots based on User-Agent strings and IP addresses."""
     
-    # Known AI bot patterns
+    # Known AI bot patterns; on a User-Agent matching several, the earlier category wins.
+    # The order is the precedence and also the scan order of _COMBINED_PATTERN, where
+    # every alternative that fails scans the whole User-Agent. It is not reordered by
+    # crawler frequency: a match may only be returned once every higher-precedence
+    # pattern has failed, so no other order that keeps the results scans less, and
+    # human User-Agents (most traffic) fail every pattern in any order
     AI_BOT_PATTERNS = {
         'ChatGPT': [
             r'GPTBot',
@@ -73,6 +81,41 @@ class AIBotDetectionService:
         ]
     }
     
+    # (category, pattern) pairs in priority order
+    _PATTERN_INDEX = [
+        (bot_category, pattern)
+        for bot_category, patterns in AI_BOT_PATTERNS.items()
+        for pattern in patterns
+    ]
+    
+    # All patterns lowercased into one regex matched against the lowercased
+    # User-Agent: each alternative is a lookahead, so the first pattern in
+    # priority order that occurs anywhere wins, as with a sequential scan
+    _COMBINED_PATTERN = re.compile(
+        '|'.join(
+            f'(?=.*?(?P<p{index}>{pattern.lower()}))'
+            for index, (_, pattern) in enumerate(_PATTERN_INDEX)
+        ),
+        re.DOTALL
+    )
+    
+    # Recent comprehensive detection results, keyed by (user_agent, ip_address, IP store generation)
+    _detection_cache = TTLCache(maxsize=50_000, ttl=300)
+    _detection_cache_lock = threading.Lock()
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _match_user_agent(user_agent: str) -> Tuple[Optional[str], Optional[str], str]:
+        """Match a User-Agent once, returning (bot_category, bot_pattern, bot_name)."""
+        match = AIBotDetectionService._COMBINED_PATTERN.match(user_agent.lower())
+        if not match:
+            return None, None, 'unknown'
+        
+        bot_category, bot_pattern = AIBotDetectionService._PATTERN_INDEX[int(match.lastgroup[1:])]
+        # Remove regex special characters and return clean name
+        bot_name = re.sub(r'[^\w\-\.]', '', bot_pattern) or bot_category
+        return bot_category, bot_pattern, bot_name
+    
     @classmethod
     def detect_ai_bot(cls, user_agent: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -86,15 +129,9 @@ class AIBotDetectionService:
         """
         if not user_agent:
             return None, None
-            
-        user_agent_lower = user_agent.lower()
         
-        for bot_category, patterns in cls.AI_BOT_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, user_agent_lower, re.IGNORECASE):
-                    return bot_category, pattern
-                    
-        return None, None
+        bot_category, bot_pattern, _ = cls._match_user_agent(user_agent)
+        return bot_category, bot_pattern
     
     @classmethod
     def is_ai_bot(cls, user_agent: str) -> bool:
@@ -121,17 +158,10 @@ class AIBotDetectionService:
         Returns:
             Bot name if detected, 'unknown' otherwise
         """
-        bot_category, bot_pattern = cls.detect_ai_bot(user_agent)
+        if not user_agent:
+            return 'unknown'
         
-        if bot_category:
-            # Extract the actual bot name from the pattern
-            if bot_pattern:
-                # Remove regex special characters and return clean name
-                clean_name = re.sub(r'[^\w\-\.]', '', bot_pattern)
-                return clean_name or bot_category
-            return bot_category
-            
-        return 'unknown'
+        return cls._match_user_agent(user_agent)[2]
     
     @classmethod
     def detect_ai_bot_comprehensive(cls, user_agent: str, ip_address: str, db: Session) -> Tuple[Optional[str], Optional[str], str]:
@@ -147,7 +177,28 @@ class AIBotDetectionService:
             Tuple of (bot_category, bot_name, detection_method)
             detection_method can be: 'user_agent', 'ip_address', 'both', or 'none'
         """
-        user_agent_category, user_agent_pattern = cls.detect_ai_bot(user_agent)
+        # Real traffic repeats the same (User-Agent, IP) pairs heavily, so serve
+        # repeats from cache; a changed IP store yields a new generation and key
+        cache_key = (user_agent, ip_address, IPRangeService._store_generation)
+        with cls._detection_cache_lock:
+            cached_result = cls._detection_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+        
+        result = cls._detect_ai_bot_comprehensive(user_agent, ip_address, db)
+        
+        with cls._detection_cache_lock:
+            cls._detection_cache[cache_key] = result
+        
+        return result
+    
+    @classmethod
+    def _detect_ai_bot_comprehensive(cls, user_agent: str, ip_address: str, db: Session) -> Tuple[Optional[str], Optional[str], str]:
+        """Run User-Agent and IP address detection without caching."""
+        # One User-Agent scan yields both the category and the bot name
+        user_agent_category, user_agent_bot_name = None, ''
+        if user_agent:
+            user_agent_category, _, user_agent_bot_name = cls._match_user_agent(user_agent)
         ip_is_bot, ip_bot_name, ip_source_type = IPRangeService(db).is_ip_in_ai_bot_range(ip_address)
         
         detected_bot_name = ''
@@ -157,7 +208,7 @@ class AIBotDetectionService:
         # Check User-Agent detection first
         if user_agent_category:
             final_category = user_agent_category
-            detected_bot_name = cls.get_bot_name(user_agent)
+            detected_bot_name = user_agent_bot_name
             detection_method = 'user_agent'
         
         # Check IP-based detection
@@ -1,11 +1,16 @@
 """Detection service."""
 
 from typing import List, Optional
+from pydantic import TypeAdapter
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.user import Detection as DetectionModel
 from app.schemas.user import DetectionCreate, Detection as DetectionSchema
 
+# Validates a whole page of ORM rows in a single pydantic-core call
+_detection_list_adapter = TypeAdapter(List[DetectionSchema])
+
 
 class DetectionService:
     """Service for detection operations."""
@@ -32,8 +37,8 @@ class DetectionService:
     
     def get_detections(self, skip: int = 0, limit: int = 100) -> List[DetectionSchema]:
         """Get all detections."""
-        detections = self.db.query(DetectionModel).offset(skip).limit(limit).all()
-        return [DetectionSchema.from_orm(detection) for detection in detections]
+        detections = self.db.scalars(select(DetectionModel).offset(skip).limit(limit)).all()
+        return _detection_list_adapter.validate_python(detections, from_attributes=True)
     
     def get_detection(self, detection_id: int) -> Optional[DetectionSchema]:
         """Get detection by ID and return it"""
@@ -1,17 +1,125 @@
 """AI Bot IP Range Service."""
 
+import asyncio
+import contextlib
+import functools
 import ipaddress
-import requests
+import re
+import socket
+import struct
+import threading
+import time
+import httpx
 import json
 from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, delete
+from sqlalchemy import and_, func, delete, select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.models.ip_ranges import AIBotIPRange, IPRangeUpdateLog
 from app.utils.logging import log_error
 
 
+# Dotted-quad candidates, matched directly on the raw response bytes
+_IPV4_RE = re.compile(rb'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b')
+
+# The "IP addresses:" ... "Countries:" section of a crawlers-info.de bot page
+_SECTION_RE = re.compile(rb'IP addresses:(.*?)Countries:', re.DOTALL)
+
+
+def _is_public_ipv4(ip: str) -> bool:
+    """Validate a dotted-quad IPv4 address and reject non-routable ones."""
+    try:
+        value = struct.unpack('!I', socket.inet_aton(ip))[0]
+    except OSError:
+        return False
+    
+    # 0.0.0.0/8 (this network), 127.0.0.0/8 (loopback), 255.255.255.0/24 (broadcast)
+    return (value >> 24) not in (0x00, 0x7F) and (value & 0xFFFFFF00) != 0xFFFFFF00
+
+
+# Bot name substrings mapped to in-memory storage categories, checked in order
+_CATEGORY_RULES = [
+    ('chatgpt', 'ChatGPT User'),
+    ('user', 'ChatGPT User'),
+    ('gptbot', 'GPTBot'),
+    ('search', 'SearchBot'),
+]
+
+
+@functools.lru_cache(maxsize=256)
+def _classify(bot_name: str) -> str:
+    """Map a bot name to its in-memory storage category (cached per distinct name)."""
+    bot_name_lower = bot_name.lower()
+    for keyword, category in _CATEGORY_RULES:
+        if keyword in bot_name_lower:
+            return category
+    return 'Other AI'
+
+
+def _ip_to_int(ip: str) -> int:
+    """Convert an IP address to an integer, parsing it in C rather than with ipaddress."""
+    if ':' not in ip:
+        return struct.unpack('!I', socket.inet_aton(ip))[0]
+    return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+
+
+# Lookup index: address family -> {prefix length: {network prefix: category}}, with
+# prefix lengths ordered longest first; single addresses are /32 (/128) prefixes
+IPIndex = Dict[int, Dict[int, Dict[int, str]]]
+
+
+def _parse_prefix(entry: str) -> Tuple[int, int, int]:
+    """Parse an address or CIDR into (family, prefix length, network prefix as an integer)."""
+    if '/' not in entry:
+        return (6, 128, _ip_to_int(entry)) if ':' in entry else (4, 32, _ip_to_int(entry))
+    
+    network = ipaddress.ip_network(entry, strict=False)
+    return (
+        network.version,
+        network.prefixlen,
+        int(network.network_address) >> (network.max_prefixlen - network.prefixlen)
+    )
+
+
+def _build_ip_index(ai_bot_ips: Dict[str, Set[str]]) -> IPIndex:
+    """Build the per-address-family prefix lookup index for the store."""
+    ip_index: IPIndex = {4: {}, 6: {}}
+    for category, ip_set in ai_bot_ips.items():
+        _index_ips(ip_index, category, ip_set)
+    return ip_index
+
+
+def _index_ips(ip_index: IPIndex, category: str, ips) -> None:
+    """Add addresses and CIDR ranges to the lookup index."""
+    for ip in ips:
+        try:
+            family, prefixlen, prefix = _parse_prefix(ip)
+        except (OSError, ValueError):
+            continue
+        
+        prefixes = ip_index[family].get(prefixlen)
+        if prefixes is None:
+            # Swap in a re-sorted copy, so concurrent lookups keep iterating the old one
+            prefixes = {}
+            by_length = dict(ip_index[family])
+            by_length[prefixlen] = prefixes
+            ip_index[family] = dict(sorted(by_length.items(), reverse=True))
+        prefixes.setdefault(prefix, category)
+
+
+def _lookup_ip(ip_index: IPIndex, ip_address: str) -> Optional[str]:
+    """Longest-prefix match of an address: one dict probe per distinct prefix length."""
+    family, bits = (6, 128) if ':' in ip_address else (4, 32)
+    ip_int = _ip_to_int(ip_address)
+    for prefixlen, prefixes in ip_index[family].items():
+        category = prefixes.get(ip_int >> (bits - prefixlen))
+        if category:
+            return category
+    return None
+
+
 class IPRangeService:
     """Service for managing AI bot IP ranges and detection."""
     
@@ -42,39 +150,128 @@ class IPRangeService:
         'Other AI': set()
     }
     
-    def __init__(self, db: Session):
+    # Prefix lookup index over _ai_bot_ips (addresses and CIDR ranges), split by address family
+    _ip_index: IPIndex = _build_ip_index(_ai_bot_ips)
+    
+    # The in-memory store is shared by all instances and loaded once per process;
+    # the generation is bumped on every change so dependent caches can invalidate
+    _store_loaded = False
+    _store_generation = 0
+    _load_lock = threading.RLock()
+    
+    # (active row count, latest last_updated) of the stored ranges at the last load;
+    # compared at most every STORE_CHECK_SECONDS to pick up other processes' updates
+    STORE_CHECK_SECONDS = 60
+    _store_version: Optional[Tuple[int, Optional[datetime]]] = None
+    _store_checked_at = 0.0
+    
+    def __init__(self, db: Session, http: Optional[httpx.AsyncClient] = None):
         self.db = db
-        self._load_ip_ranges_from_db()
+        # Long-lived HTTP client (e.g. the scheduler's) to reuse pooled connections
+        self.http = http
+        # Serializes blocking Session work that async methods hand to worker threads
+        self._db_lock = asyncio.Lock()
+        self._ensure_loaded()
+    
+    def _ensure_loaded(self):
+        """Load the shared IP store from the database on first use."""
+        if IPRangeService._store_loaded:
+            return
+        
+        with self._load_lock:
+            if not IPRangeService._store_loaded:
+                self._load_ip_ranges_from_db()
+    
+    def refresh(self):
+        """Reload the shared IP store from the database."""
+        with self._load_lock:
+            self._load_ip_ranges_from_db()
+    
+    def _read_store_version(self) -> Tuple[int, Optional[datetime]]:
+        """Summary of the stored active ranges that changes with every insert, (re)activation or deactivation."""
+        count, last_updated = self.db.execute(
+            select(func.count(AIBotIPRange.id), func.max(AIBotIPRange.last_updated))
+            .where(AIBotIPRange.is_active == True)
+        ).one()
+        return count, last_updated
+    
+    def _refresh_if_changed(self):
+        """Reload the shared IP store when the stored ranges changed, e.g. by another worker's update."""
+        now = time.monotonic()
+        if now - IPRangeService._store_checked_at < self.STORE_CHECK_SECONDS:
+            return
+        
+        with self._load_lock:
+            if now - IPRangeService._store_checked_at < self.STORE_CHECK_SECONDS:
+                return
+            IPRangeService._store_checked_at = now
+            
+            try:
+                version = self._read_store_version()
+            except Exception as e:
+                print(f"❌ Error checking IP ranges version: {e}")
+                return
+            
+            if version != IPRangeService._store_version:
+                self._load_ip_ranges_from_db()
+    
+    def _add_to_store(self, category: str, ips: List[str]):
+        """Add IP addresses to the shared in-memory store and its lookup index."""
+        with self._load_lock:
+            self._ai_bot_ips[category].update(ips)
+            _index_ips(self._ip_index, category, ips)
+            self._bump_generation()
+    
+    @contextlib.asynccontextmanager
+    async def _http_client(self):
+        """Yield the shared HTTP client, or a one-off client when none was given."""
+        if self.http is not None:
+            yield self.http
+        else:
+            async with httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=16)) as client:
+                yield client
+    
+    async def _run_db(self, func, *args, **kwargs):
+        """Run blocking Session work in a worker thread, one call at a time."""
+        async with self._db_lock:
+            return await asyncio.to_thread(func, *args, **kwargs)
+    
+    @classmethod
+    def _bump_generation(cls):
+        """Mark the shared IP store as changed."""
+        with cls._load_lock:
+            cls._store_generation += 1
     
     def _load_ip_ranges_from_db(self):
         """Load IP ranges from database into memory."""
         try:
             print("🔄 Loading IP ranges from database...")
             
-            # Получаем все активные IP адреса из базы данных
-            ip_ranges = self.db.query(AIBotIPRange).filter(AIBotIPRange.is_active == True).all()
+            version = self._read_store_version()
+            
+            # Получаем только нужные колонки активных IP адресов, потоково
+            rows = self.db.execute(
+                select(AIBotIPRange.ip_address, AIBotIPRange.bot_name)
+                .where(AIBotIPRange.is_active == True)
+                .execution_options(yield_per=5000)
+            )
             
-            # Очищаем память
-            for category in self._ai_bot_ips:
-                self._ai_bot_ips[category].clear()
+            # Собираем новое хранилище и подменяем его целиком, чтобы
+            # параллельные запросы не видели наполовину загруженные данные
+            ai_bot_ips: Dict[str, Set[str]] = {category: set() for category in self._ai_bot_ips}
             
             # Загружаем IP адреса в память
             loaded_count = 0
-            for ip_range in ip_ranges:
-                # Определяем категорию бота
-                storage_category = None
-                if 'chatgpt' in ip_range.bot_name.lower() or 'user' in ip_range.bot_name.lower():
-                    storage_category = 'ChatGPT User'
-                elif 'gptbot' in ip_range.bot_name.lower():
-                    storage_category = 'GPTBot'
-                elif 'search' in ip_range.bot_name.lower():
-                    storage_category = 'SearchBot'
-                else:
-                    storage_category = 'Other AI'
-                
-                if storage_category in self._ai_bot_ips:
-                    self._ai_bot_ips[storage_category].add(ip_range.ip_address)
-                    loaded_count += 1
+            for ip_address, bot_name in rows:
+                ai_bot_ips[_classify(bot_name)].add(ip_address)
+                loaded_count += 1
+            
+            IPRangeService._ip_index = _build_ip_index(ai_bot_ips)
+            IPRangeService._ai_bot_ips = ai_bot_ips
+            IPRangeService._store_version = version
+            IPRangeService._store_checked_at = time.monotonic()
+            IPRangeService._store_loaded = True
+            self._bump_generation()
             
             print(f"✅ Loaded {loaded_count} IP addresses from database")
             
@@ -95,25 +292,17 @@ class IPRangeService:
             return False, None, None
             
         try:
-            # Проверяем в временном хранилище (in-memory)
-            for bot_name, ip_set in self._ai_bot_ips.items():
-                if ip_address in ip_set:
-                    return True, bot_name, 'direct_ip'
+            # Хранилище в памяти содержит все активные адреса и диапазоны из базы;
+            # изменения других процессов подхватываются проверкой версии
+            self._refresh_if_changed()
             
-            # Если IP не найден в памяти, попробуем базу данных как fallback
             try:
-                exact_match = self.db.query(AIBotIPRange).filter(
-                    and_(
-                        AIBotIPRange.ip_address == ip_address,
-                        AIBotIPRange.source_type == 'direct_ip',
-                        AIBotIPRange.is_active == True
-                    )
-                ).first()
-                
-                if exact_match:
-                    return True, exact_match.bot_name, 'direct_ip'
-            except Exception:
-                pass  # Игнорируем ошибки базы данных, используем только память
+                bot_name = _lookup_ip(self._ip_index, ip_address)
+            except (OSError, ValueError):
+                return False, None, None
+            
+            if bot_name:
+                return True, bot_name, 'direct_ip'
             
             return False, None, None
             
@@ -130,48 +319,31 @@ class IPRangeService:
         
         try:
             # Определяем категорию бота для нашего хранилища
-            storage_category = None
-            if 'chatgpt' in bot_name.lower() or 'user' in bot_name.lower():
-                storage_category = 'ChatGPT User'
-            elif 'gptbot' in bot_name.lower():
-                storage_category = 'GPTBot'
-            elif 'search' in bot_name.lower():
-                storage_category = 'SearchBot'
-            else:
-                storage_category = 'Other AI'
+            storage_category = _classify(bot_name)
             
             # Проверяем валидность IP
             if not self._is_valid_ip(ip_address):
                 print(f"❌ Неверный IP адрес: {ip_address}")
                 return False
             
-            # Проверяем, не существует ли уже этот IP в базе данных
-            existing_ip = self.db.query(AIBotIPRange).filter(
-                AIBotIPRange.bot_name == bot_name,
-                AIBotIPRange.ip_address == ip_address
-            ).first()
+            # Вставляем запись; уникальный индекс (bot_name, ip_address) пропускает
+            # активные дубликаты, а неактивную запись снова включает
+            inserted_count = self._upsert_ip_rows([{
+                'bot_name': bot_name,
+                'ip_address': ip_address,
+                'source_type': source_type,
+                'source_url': source_url,
+                'is_active': True
+            }])
+            self.db.commit()
+            
+            # Добавляем в память
+            self._add_to_store(storage_category, [ip_address])
             
-            if existing_ip:
+            if not inserted_count:
                 print(f"⚠️ IP {ip_address} уже существует в базе данных")
-                # Добавляем в память для консистентности
-                self._ai_bot_ips[storage_category].add(ip_address)
                 return True
             
-            # Создаем новую запись в базе данных
-            new_ip_range = AIBotIPRange(
-                bot_name=bot_name,
-                ip_address=ip_address,
-                source_type=source_type,
-                source_url=source_url,
-                is_active=True
-            )
-            
-            self.db.add(new_ip_range)
-            self.db.commit()
-            self.db.refresh(new_ip_range)
-            
-            # Добавляем в память
-            self._ai_bot_ips[storage_category].add(ip_address)
             print(f"✅ Добавлен IP {ip_address} в категорию {storage_category} (сохранено в БД)")
             return True
                 
@@ -199,52 +371,26 @@ class IPRangeService:
             if not bot_name:
                 bot_name = source_name.replace('_', ' ').replace('openai', 'OpenAI').title()
             
-            # Fetch IP list from URL
-            response = requests.get(source_url, timeout=30)
-            response.raise_for_status()
-            
-            ip_lines = [line.strip() for line in response.text.strip().split('\n') if line.strip()]
-            
-            # Get existing IPs for this bot
-            existing_ips = {ip.ip_address for ip in self.db.query(AIBotIPRange.ip_address).filter(
-                or_(
-                    AIBotIPRange.bot_name == bot_name,
-                    AIBotIPRange.bot_name.like(f'%{bot_name}%')
-                )
-            ).all()}
-            
-            # Process new IPs
-            new_ips = set(ip_lines) - existing_ips
-            removed_ips = existing_ips - set(ip_lines)
-            
-            changes_count = 0
-            
-            # Add new IPs
-            for ip in new_ips:
-                if self._is_valid_ip(ip):
-                    self.add_ip_address(
-                        bot_name=bot_name,
-                        ip_address=ip,
-                        source_type='direct_ip',
-                        source_url=source_url
-                    )
-                    changes_count += 1
-            
-            # Deactivate removed IPs (don't delete, just mark as inactive)
-            for ip in removed_ips:
-                self.db.query(AIBotIPRange).filter(
-                    and_(
-                        AIBotIPRange.ip_address == ip,
-                        AIBotIPRange.bot_name == bot_name
-                    )
-                ).update({'is_active': False, 'last_updated': func.now()})
-                changes_count += 1
-            
-            self.db.commit()
+            # Fetch IP list from URL without blocking the event loop,
+            # parsing the body line by line as it streams in
+            async with self._http_client() as client:
+                async with client.stream('GET', source_url) as response:
+                    response.raise_for_status()
+                    source_ips = set()
+                    async for line in response.aiter_lines():
+                        line = line.strip()
+                        if line:
+                            source_ips.add(line)
+            
+            # Work with the database in a worker thread so the other sources keep downloading
+            new_ips_count, removed_ips_count, changes_count = await self._run_db(
+                self._apply_source_ips, bot_name, source_url, source_ips
+            )
             
             # Log update
             duration = (datetime.now() - start_time).total_seconds()
-            self._log_update(
+            await self._run_db(
+                self._log_update,
                 bot_name=bot_name,
                 update_type='full_update',
                 changes_count=changes_count,
@@ -256,9 +402,9 @@ class IPRangeService:
                 'success': True,
                 'bot_name': bot_name,
                 'source_url': source_url,
-                'new_ips_count': len(new_ips),
-                'removed_ips_count': len(removed_ips),
-                'total_ips': len(ip_lines),
+                'new_ips_count': new_ips_count,
+                'removed_ips_count': removed_ips_count,
+                'total_ips': len(source_ips),
                 'duration_seconds': duration,
                 'changes_count': changes_count
             }
@@ -272,7 +418,8 @@ class IPRangeService:
             )
             
             # Log failed update
-            self._log_update(
+            await self._run_db(
+                self._log_failed_update,
                 bot_name=bot_name or source_name,
                 update_type='full_update',
                 changes_count=0,
@@ -288,14 +435,81 @@ class IPRangeService:
                 'source_url': source_url
             }
     
+    def _apply_source_ips(self, bot_name: str, source_url: str, source_ips: Set[str]) -> Tuple[int, int, int]:
+        """Sync stored IPs of a bot with a fetched source list; returns (new, removed, changes) counts."""
+        # Get active IPs stored under exactly this bot name, the rows the deactivation below
+        # can reach; IPs deactivated earlier count as new and are reactivated
+        existing_ips = set(self.db.scalars(
+            select(AIBotIPRange.ip_address).where(
+                AIBotIPRange.is_active == True,
+                AIBotIPRange.bot_name == bot_name
+            )
+        ))
+        
+        # Process new IPs
+        new_ips = source_ips - existing_ips
+        removed_ips = existing_ips - source_ips
+        
+        # Add new IPs and reactivate returning ones in a single bulk upsert
+        valid_new_ips = [ip for ip in new_ips if self._is_valid_ip(ip)]
+        if valid_new_ips:
+            self._upsert_ip_rows([
+                {
+                    'bot_name': bot_name,
+                    'ip_address': ip,
+                    'source_type': 'direct_ip',
+                    'source_url': source_url,
+                    'is_active': True
+                }
+                for ip in valid_new_ips
+            ])
+        
+        # Deactivate removed IPs (don't delete, just mark as inactive)
+        if removed_ips:
+            self.db.query(AIBotIPRange).filter(
+                and_(
+                    AIBotIPRange.ip_address.in_(removed_ips),
+                    AIBotIPRange.bot_name == bot_name
+                )
+            ).update({'is_active': False, 'last_updated': func.now()}, synchronize_session=False)
+        
+        self.db.commit()
+        
+        # Добавляем новые IP в память одним проходом; после деактивации
+        # перечитываем хранилище, чтобы удалённые IP не остались в памяти
+        if removed_ips:
+            self.refresh()
+        elif valid_new_ips:
+            self._add_to_store(_classify(bot_name), valid_new_ips)
+        
+        return len(new_ips), len(removed_ips), len(valid_new_ips) + len(removed_ips)
+    
+    def _log_failed_update(self, **kwargs) -> IPRangeUpdateLog:
+        """Log a failed update, discarding the failed transaction first."""
+        self.db.rollback()
+        return self._log_update(**kwargs)
+    
     async def update_all_ai_bot_ips(self) -> Dict[str, Any]:
         """Update IP ranges for all known AI bot sources."""
         results = {}
         total_updates = 0
         successful_updates = 0
         
-        for source_name, source_url in self.IP_SOURCES.items():
-            result = await self.update_ip_ranges_from_source(source_name, source_url)
+        # Fetch all sources concurrently: total time is the slowest source, not the sum
+        source_results = await asyncio.gather(
+            *[self.update_ip_ranges_from_source(source_name, source_url)
+              for source_name, source_url in self.IP_SOURCES.items()],
+            return_exceptions=True
+        )
+        
+        for source_name, result in zip(self.IP_SOURCES, source_results):
+            if isinstance(result, Exception):
+                result = {
+                    'success': False,
+                    'error': f"Failed to update IP ranges for {source_name}: {str(result)}",
+                    'bot_name': source_name,
+                    'source_url': self.IP_SOURCES[source_name]
+                }
             results[source_name] = result
             
             if result.get('success'):
@@ -337,6 +551,18 @@ class IPRangeService:
             'last_updates': {}
         }
     
+    def _upsert_ip_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert IP rows in one statement, reactivating existing inactive (bot_name, ip_address) pairs.
+        
+        Returns the number of inserted or reactivated rows; active pairs are left untouched.
+        """
+        stmt = insert(AIBotIPRange).values(rows).on_conflict_do_update(
+            index_elements=['bot_name', 'ip_address'],
+            set_={'is_active': True, 'last_updated': func.now()},
+            where=AIBotIPRange.is_active == False
+        )
+        return self.db.execute(stmt).rowcount
+    
     def _is_valid_ip(self, ip: str) -> bool:
         """Check if IP address is valid."""
         try:
@@ -380,7 +606,43 @@ class IPRangeService:
         self.db.commit()
         return deleted_count
     
-    def update_chatgpt_ips_from_crawlers_info(self, bot_name: str = 'ChatGPT-User') -> Dict[str, Any]:
+    def _save_chatgpt_ips(self, bot_name: str, chatgpt_ips: List[str]) -> int:
+        """Bulk insert crawlers-info.de IPs, refresh memory and log the update."""
+        source_url = 'https://crawlers-info.de/bots_info/973bdf5bbc8784a0b8204b9ca4aa5aae'
+        changes_count = 0
+        
+        try:
+            # Добавляем новые IP в базу данных одним запросом
+            if chatgpt_ips:
+                changes_count = self._upsert_ip_rows([
+                    {
+                        'bot_name': bot_name,
+                        'ip_address': ip,
+                        'source_type': 'crawlers_info',
+                        'source_url': source_url,
+                        'is_active': True
+                    }
+                    for ip in dict.fromkeys(chatgpt_ips)
+                ])
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        # Обновляем в памяти из базы данных
+        self.refresh()
+        
+        # Логируем обновление
+        self._log_update(
+            bot_name=bot_name,
+            update_type='manual_update',
+            changes_count=changes_count,
+            source_url=source_url
+        )
+        
+        return changes_count
+    
+    async def update_chatgpt_ips_from_crawlers_info(self, bot_name: str = 'ChatGPT-User') -> Dict[str, Any]:
         """Update ChatGPT IP addresses from crawlers-info.de database."""
         
         try:
@@ -388,34 +650,28 @@ class IPRangeService:
             
             # Fetch data from crawlers-info.de
             url = "https://crawlers-info.de/bots_info/973bdf5bbc8784a0b8204b9ca4aa5aae"
-            response = requests.get(url, timeout=30)
+            async with self._http_client() as client:
+                response = await client.get(url)
             response.raise_for_status()
             
             print(f"✅ Got response from crawlers-info.de: {response.status_code}")
             
             # Parse IP addresses from the HTML content
-            # Look for IP addresses in the "IP addresses:" section
-            import re
-            
-            # Find the section from 'IP addresses:' to 'Countries:'
-            start_marker = 'IP addresses:'
-            end_marker = 'Countries:'
+            # Locate the section from 'IP addresses:' to 'Countries:' in one regex pass
+            response_content = response.content
+            section = _SECTION_RE.search(response_content)
             
-            start_pos = response.text.find(start_marker)
-            end_pos = response.text.find(end_marker)
-            
-            if start_pos != -1 and end_pos != -1:
-                ip_section_text = response.text[start_pos:end_pos]
+            if section:
+                start_pos, end_pos = section.span(1)
                 print(f"📄 Found IP addresses section from position {start_pos} to {end_pos}")
                 
-                # Extract IP addresses only from this section
-                ip_pattern = r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b'
-                found_ips = re.findall(ip_pattern, ip_section_text)
-                
-                # Filter out some common non-IP patterns and validate
+                # Extract IP addresses only from this section, scanning the
+                # raw bytes in place instead of decoding and slicing them
                 chatgpt_ips = []
-                for ip in found_ips:
-                    if self._is_valid_ip(ip) and not any(x in ip for x in ['0.0.0.0', '127.0.0', '255.255.255']):
+                for match in _IPV4_RE.finditer(response_content, start_pos, end_pos):
+                    ip = match.group().decode('ascii')
+                    # Filter out non-routable addresses and validate
+                    if _is_public_ipv4(ip):
                         chatgpt_ips.append(ip)
             else:
                 print("❌ Could not find 'IP addresses:' section")
@@ -427,28 +683,8 @@ class IPRangeService:
             sample_ips = chatgpt_ips[:10]
             print(f"📋 Sample IPs: {sample_ips}")
             
-            # Обновляем в памяти
-            self._ai_bot_ips['ChatGPT User'] = set(chatgpt_ips)
-            
-            changes_count = 0
-            
-            # Добавляем новые IP в базу данных
-            for ip in chatgpt_ips:
-                if self.add_ip_address(
-                    bot_name=bot_name,
-                    ip_address=ip,
-                    source_type='crawlers_info',
-                    source_url='https://crawlers-info.de/bots_info/973bdf5bbc8784a0b8204b9ca4aa5aae'
-                ):
-                    changes_count += 1
-            
-            # Логируем обновление
-            self._log_update(
-                bot_name=bot_name,
-                update_type='manual_update',
-                changes_count=changes_count,
-                source_url='https://crawlers-info.de/bots_info/973bdf5bbc8784a0b8204b9ca4aa5aae'
-            )
+            # Синхронная работа с БД выполняется в отдельном потоке, не блокируя event loop
+            changes_count = await self._run_db(self._save_chatgpt_ips, bot_name, chatgpt_ips)
             
             return {
                 'status': 'success',
@@ -461,7 +697,8 @@ class IPRangeService:
             
         except Exception as e:
             error_details = f"Failed to update ChatGPT IPs: {str(e)}"
-            self._log_update(
+            await self._run_db(
+                self._log_update,
                 bot_name=bot_name,
                 update_type='manual_update',
                 changes_count=0,
@@ -1,16 +1,19 @@
 """Scheduler service for automated tasks."""
 
 import asyncio
-import schedule
-import time
 import threading
+import httpx
 from datetime import datetime, timedelta
 from typing import Optional, Callable, Dict, Any
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db.session import SchedulerSession
 from app.services.ip_range_service import IPRangeService
-from app.utils.logging import log_error
+from app.services.tracking_service import (
+    TrackingEventService, EVENT_QUEUE, drain_event_queue, event_queue_lock, event_writer_active
+)
+from app.utils.logging import log_error, flush_errors
 
 
 class SchedulerService:
@@ -19,8 +22,16 @@ class SchedulerService:
     def __init__(self):
         self.db_session: Optional[Session] = None
         self.scheduler_thread: Optional[threading.Thread] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # HTTP client shared by the IP update jobs, kept open while the scheduler runs
+        self.http: Optional[httpx.AsyncClient] = None
+        self.event_writer = None
         self.is_running = False
         self.tasks: Dict[str, Dict[str, Any]] = {}
+        # Timer-driven jobs on the scheduler loop: name -> schedule, next run and timer handle
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._running_jobs = set()
+        self._loop_lock = threading.Lock()
     
     def start_scheduler(self):
         """Start the scheduler service."""
@@ -28,44 +39,71 @@ class SchedulerService:
             print("⚠️  Scheduler is already running")
             return
         
+        loop = self._ensure_loop()
         self.is_running = True
         
+        # Keep-alive connections to the IP sources are reused across runs
+        self.http = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(max_connections=32, keepalive_expiry=300)
+        )
+        
         # Schedule GitHub IP range updates daily at 05:00
-        schedule.every().day.at("05:00").do(self._run_ip_update_task)
+        loop.call_soon_threadsafe(self._add_job, 'ip_update', self._run_ip_update_task, '05:00', None)
         
         # Schedule daily ChatGPT IP update from crawlers-info.de at 06:00 daily
-        schedule.every().day.at("06:00").do(self._run_chatgpt_ip_update_task)
+        loop.call_soon_threadsafe(self._add_job, 'chatgpt_ip_update', self._run_chatgpt_ip_update_task, '06:00', None)
         
         # Schedule cleanup tasks daily
-        schedule.every().day.at("02:00").do(self._run_cleanup_task)
+        loop.call_soon_threadsafe(self._add_job, 'cleanup', self._run_cleanup_task, '02:00', None)
+        
+        # Write buffered error log records every 30 seconds
+        loop.call_soon_threadsafe(self._add_job, 'flush_errors', flush_errors, None, timedelta(seconds=30))
         
-        # Start scheduler in background thread
-        self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
-        self.scheduler_thread.start()
+        # Write queued tracking events in batches
+        self.event_writer = asyncio.run_coroutine_threadsafe(self._run_event_writer(), loop)
         
         print("🕐 Scheduler started")
     
-    def stop_scheduler(self):
-        """Stop the scheduler service."""
+    async def stop_scheduler(self):
+        """Stop the scheduler service, waiting without blocking the caller's event loop."""
         self.is_running = False
-        schedule.clear()
         
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=5)
+        if self.loop is not None:
+            async def cancel_jobs():
+                for job in self.jobs.values():
+                    job['handle'].cancel()
+                self.jobs.clear()
+                
+                if self.http is not None:
+                    await self.http.aclose()
+                    self.http = None
+            
+            await self._wait_on_loop(asyncio.run_coroutine_threadsafe(cancel_jobs(), self.loop), timeout=5)
+        
+        # Let the event writer save what is still queued
+        if self.event_writer is not None:
+            try:
+                await self._wait_on_loop(self.event_writer, timeout=10)
+            except Exception as e:
+                print(f"⚠️  Event writer did not finish: {str(e)}")
+            self.event_writer = None
+        
+        flush_errors()
         
         print("🛑 Scheduler stopped")
     
-    def schedule_ip_update_now(self):
-        """Manually trigger IP update task."""
-        self._run_ip_update_task()
+    async def schedule_ip_update_now(self):
+        """Manually trigger IP update task and wait for it to finish."""
+        await self._run_now(self._run_ip_update_task)
     
-    def schedule_cleanup_now(self):
-        """Manually trigger cleanup task."""
-        self._run_cleanup_task()
+    async def schedule_cleanup_now(self):
+        """Manually trigger cleanup task and wait for it to finish."""
+        await self._run_now(self._run_cleanup_task)
     
-    def schedule_chatgpt_ip_update_now(self):
-        """Manually trigger ChatGPT IP update task."""
-        self._run_chatgpt_ip_update_task()
+    async def schedule_chatgpt_ip_update_now(self):
+        """Manually trigger ChatGPT IP update task and wait for it to finish."""
+        await self._run_now(self._run_chatgpt_ip_update_task)
     
     def register_task(self, name: str, func: Callable, interval_hours: int = 24, immediate: bool = False):
         """Register a custom task with the scheduler."""
@@ -73,7 +111,9 @@ class SchedulerService:
         if immediate:
             schedule_func()
         
-        schedule.every(interval_hours).hours.do(schedule_func)
+        self._ensure_loop().call_soon_threadsafe(
+            self._add_job, name, schedule_func, None, timedelta(hours=interval_hours)
+        )
         
         self.tasks[name] = {
             'func': func,
@@ -84,80 +124,174 @@ class SchedulerService:
         
         print(f"📋 Task '{name}' registered with {interval_hours}h interval")
     
-    def _run_scheduler(self):
-        """Main scheduler loop."""
-        print("🕒 Scheduler thread started")
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the persistent scheduler event loop in a background thread."""
+        with self._loop_lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                # Short tasks start eagerly, without waiting for a loop iteration (Python 3.12+)
+                if hasattr(asyncio, 'eager_task_factory'):
+                    loop.set_task_factory(asyncio.eager_task_factory)
+                
+                self.scheduler_thread = threading.Thread(target=loop.run_forever, daemon=True)
+                self.scheduler_thread.start()
+                self.loop = loop
+                print("🕒 Scheduler loop started")
         
-        while self.is_running:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-            except Exception as e:
-                error_msg = f"Scheduler error: {str(e)}"
-                print(f"❌ {error_msg}")
-                log_error(
-                    error_message=error_msg,
-                    error_details=str(e),
-                    site_id=None
-                )
+        return self.loop
+    
+    def _add_job(self, name: str, func: Callable, at: Optional[str], interval: Optional[timedelta]):
+        """Add a job running daily at HH:MM or every interval (scheduler loop only)."""
+        if name in self.jobs:
+            self.jobs[name]['handle'].cancel()
+        
+        self.jobs[name] = {'func': func, 'at': at, 'interval': interval}
+        self._arm_job(name)
+    
+    def _arm_job(self, name: str):
+        """Set the timer for the next run of a job (scheduler loop only)."""
+        job = self.jobs[name]
+        now = datetime.now()
+        
+        if job['at']:
+            # Count from the run that just fired as well: the loop timer is monotonic,
+            # so it can fire slightly before the wall-clock time and must not repeat it
+            after = max(now, job.get('next_run') or now)
+            hour, minute = map(int, job['at'].split(':'))
+            next_run = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= after:
+                next_run += timedelta(days=1)
+        else:
+            next_run = now + job['interval']
+        
+        job['next_run'] = next_run
+        job['handle'] = self.loop.call_later((next_run - now).total_seconds(), self._fire_job, name)
+    
+    def _fire_job(self, name: str):
+        """Start a due job and set its next run (scheduler loop only)."""
+        job = self.jobs.get(name)
+        if job is None or not self.is_running:
+            return
+        
+        task = self.loop.create_task(self._execute(job['func']))
+        # Keep a reference until the job finishes so it is not garbage collected
+        self._running_jobs.add(task)
+        task.add_done_callback(self._running_jobs.discard)
+        
+        self._arm_job(name)
+    
+    async def _execute(self, func: Callable):
+        """Run a job: coroutines on the loop, blocking functions in a worker thread."""
+        try:
+            if asyncio.iscoroutinefunction(func):
+                await func()
+            else:
+                await asyncio.to_thread(func)
+        except Exception as e:
+            error_msg = f"Scheduler error: {str(e)}"
+            print(f"❌ {error_msg}")
+            log_error(
+                error_message=error_msg,
+                error_details=str(e),
+                site_id=None
+            )
+    
+    @staticmethod
+    async def _wait_on_loop(future, timeout: float):
+        """Await a scheduler loop future from another event loop; a timeout leaves the work running."""
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+    
+    async def _run_now(self, func: Callable):
+        """Run a job on the scheduler loop and wait for it without blocking the caller's event loop."""
+        await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._execute(func), self._ensure_loop())
+        )
+    
+    async def _run_event_writer(self):
+        """Write queued tracking events to the database in batches while the scheduler runs."""
+        if event_writer_active.is_set():
+            return
+        
+        event_writer_active.set()
+        print("📝 Event writer started")
         
-        print("🕒 Scheduler thread stopped")
+        try:
+            while self.is_running:
+                rows = await asyncio.to_thread(drain_event_queue, 500, 0.05)
+                if rows:
+                    await self._write_events(rows)
+        finally:
+            # Stop taking rows first, then write whatever was queued up to that point
+            with event_queue_lock:
+                event_writer_active.clear()
+            while not EVENT_QUEUE.empty():
+                rows = await asyncio.to_thread(drain_event_queue, 500, 0)
+                if rows:
+                    await self._write_events(rows)
+            print("📝 Event writer stopped")
     
-    def _run_ip_update_task(self):
+    async def _write_events(self, rows):
+        """Write one batch of queued event rows; failures are logged, not raised."""
+        db = SchedulerSession()
+        try:
+            await asyncio.to_thread(TrackingEventService(db).ingest_batch, rows)
+        except Exception as e:
+            error_msg = f"Failed to write {len(rows)} tracking events: {str(e)}"
+            print(f"❌ {error_msg}")
+            log_error(
+                error_message=error_msg,
+                error_details=str(e),
+                site_id=None
+            )
+        finally:
+            SchedulerSession.remove()
+    
+    async def _run_ip_update_task(self):
         """Run IP update task."""
         print("🔄 Starting scheduled IP update...")
         
-        async def main():
-            db = SessionLocal()
-            try:
-                ip_service = IPRangeService(db)
-                result = await ip_service.update_all_ai_bot_ips()
-                
-                success_count = result['successful_updates']
-                total_count = result['total_sources']
-                
-                print(f"✅ Scheduled IP update completed: {success_count}/{total_count} sources updated")
-                
-                # Log successful updates
-                for source_name, source_result in result['sources'].items():
-                    if source_result.get('success'):
-                        ip_count = source_result.get('total_ips', 0)
-                        new_count = source_result.get('new_ips_count', 0)
-                        print(f"  📡 {source_name}: {ip_count} IPs ({new_count} new)")
-                
-                # Update task tracking
-                self._update_task_status('ip_update', success=success_count > 0)
-                
-            except Exception as e:
-                error_msg = f"Scheduled IP update failed: {str(e)}"
-                print(f"❌ {error_msg}")
-                log_error(
-                    error_message=error_msg,
-                    error_details=str(e),
-                    site_id=None
-                )
-                self._update_task_status('ip_update', success=False, error=error_msg)
-            finally:
-                db.close()
-        
-        # Run async function
+        db = SchedulerSession()
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(main())
-            loop.close()
+            ip_service = await asyncio.to_thread(IPRangeService, db, http=self.http)
+            result = await ip_service.update_all_ai_bot_ips()
+            
+            success_count = result['successful_updates']
+            total_count = result['total_sources']
+            
+            print(f"✅ Scheduled IP update completed: {success_count}/{total_count} sources updated")
+            
+            # Log successful updates
+            for source_name, source_result in result['sources'].items():
+                if source_result.get('success'):
+                    ip_count = source_result.get('total_ips', 0)
+                    new_count = source_result.get('new_ips_count', 0)
+                    print(f"  📡 {source_name}: {ip_count} IPs ({new_count} new)")
+            
+            # Update task tracking
+            self._update_task_status('ip_update', success=success_count > 0)
+            
         except Exception as e:
-            print(f"❌ Error running IP update task: {str(e)}")
+            error_msg = f"Scheduled IP update failed: {str(e)}"
+            print(f"❌ {error_msg}")
+            log_error(
+                error_message=error_msg,
+                error_details=str(e),
+                site_id=None
+            )
+            self._update_task_status('ip_update', success=False, error=error_msg)
+        finally:
+            SchedulerSession.remove()
     
-    def _run_chatgpt_ip_update_task(self):
+    async def _run_chatgpt_ip_update_task(self):
         """Run ChatGPT IP update task from crawlers-info.de."""
         print("🤖 Starting scheduled ChatGPT IP update from crawlers-info.de...")
         
+        db = SchedulerSession()
         try:
-            db = SessionLocal()
-            ip_service = IPRangeService(db)
+            # Loading the IP store may hit the database, keep it off the loop
+            ip_service = await asyncio.to_thread(IPRangeService, db, http=self.http)
             
-            result = ip_service.update_chatgpt_ips_from_crawlers_info()
+            result = await ip_service.update_chatgpt_ips_from_crawlers_info()
             
             if result['status'] == 'success':
                 ip_count = result['total_ips']
@@ -176,8 +310,6 @@ class SchedulerService:
                 )
                 self._update_task_status('chatgpt_ip_update', success=False, error=error_msg)
             
-            db.close()
-            
         except Exception as e:
             error_msg = f"Scheduled ChatGPT IP update failed: {str(e)}"
             print(f"❌ {error_msg}")
@@ -187,23 +319,35 @@ class SchedulerService:
                 site_id=None
             )
             self._update_task_status('chatgpt_ip_update', success=False, error=error_msg)
+        finally:
+            SchedulerSession.remove()
     
-    def _run_cleanup_task(self):
+    async def _run_cleanup_task(self):
         """Run cleanup tasks."""
         print("🧹 Starting scheduled cleanup...")
         
+        db = SchedulerSession()
         try:
-            db = SessionLocal()
-            ip_service = IPRangeService(db)
+            ip_service = await asyncio.to_thread(IPRangeService, db, http=self.http)
             
             # Clean up old logs (30 days)
-            deleted_logs = ip_service.cleanup_old_logs(days=30)
+            deleted_logs = await asyncio.to_thread(ip_service.cleanup_old_logs, days=30)
             
             print(f"🧹 Cleanup completed: {deleted_logs} old logs deleted")
             
-            self._update_task_status('cleanup', success=True)
+            tracking_service = TrackingEventService(db)
+            
+            # Keep the monthly event partitions created ahead of incoming events
+            await asyncio.to_thread(tracking_service.ensure_event_partitions)
+            print("🗂️ Event partitions ensured")
             
-            db.close()
+            # Drop expired event partitions and delete the remaining expired events
+            deleted_events = await asyncio.to_thread(
+                tracking_service.delete_old_events, days=settings.EVENT_RETENTION_DAYS
+            )
+            print(f"🧹 Event retention: {deleted_events} events older than {settings.EVENT_RETENTION_DAYS} days deleted")
+            
+            self._update_task_status('cleanup', success=True)
             
         except Exception as e:
             error_msg = f"Scheduled cleanup failed: {str(e)}"
@@ -214,6 +358,8 @@ class SchedulerService:
                 site_id=None
             )
             self._update_task_status('cleanup', success=False, error=error_msg)
+        finally:
+            SchedulerSession.remove()
     
     def _update_task_status(self, task_name: str, success: bool, error: str = None):
         """Update task execution status."""
@@ -233,16 +379,16 @@ class SchedulerService:
     def get_scheduler_status(self) -> Dict[str, Any]:
         """Get current scheduler status."""
         next_run_times = []
-        for job in schedule.jobs:
+        for name, job in list(self.jobs.items()):
             next_run_times.append({
-                'job': job.job_func.__name__ if hasattr(job.job_func, '__name__') else str(job.job_func),
-                'next_run': job.next_run.isoformat() if job.next_run else None
+                'job': name,
+                'next_run': job['next_run'].isoformat() if job.get('next_run') else None
             })
         
         return {
             'is_running': self.is_running,
             'registered_tasks': len(self.tasks),
-            'scheduled_jobs': len(schedule.jobs),
+            'scheduled_jobs': len(next_run_times),
             'tasks_status': self.tasks,
             'next_run_times': next_run_times
         }
@@ -1,13 +1,45 @@
 """Site service."""
 
+import threading
 import uuid
 from typing import List, Optional
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import bindparam, func, select
 
 from app.models.site import Site as SiteModel
 from app.schemas.site import SiteCreate, SiteUpdate, Site as SiteSchema
 
+# Statements built once at import; parameters are bound per call
+_SITES_BY_USER = select(SiteModel).where(SiteModel.user_id == bindparam('user_id'))
+_ACTIVE_SITES_BY_USER = _SITES_BY_USER.where(SiteModel.is_active == True)
+_SITE_BY_ID = select(SiteModel).where(SiteModel.id == bindparam('id'))
+_USER_SITE_BY_ID = _SITE_BY_ID.where(SiteModel.user_id == bindparam('user_id'))
+_ACTIVE_USER_SITE_BY_ID = _USER_SITE_BY_ID.where(SiteModel.is_active == True)
+_ACTIVE_SITE_BY_SITE_ID = select(SiteModel).where(
+    SiteModel.site_id == bindparam('site_id'), SiteModel.is_active == True
+)
+_COUNT_ACTIVE_USER_SITES = select(func.count()).select_from(SiteModel).where(
+    SiteModel.user_id == bindparam('user_id'), SiteModel.is_active == True
+)
+
+# Active sites by their public site_id, for the tracking and snippet endpoints that
+# resolve it on every hit. Updates and deletes drop the entry only in the worker that
+# handled them; other workers keep serving the old site until the entry expires, so
+# the TTL is the bound on how long a deleted or deactivated site still accepts events
+_site_by_site_id_cache = TTLCache(maxsize=10_000, ttl=10)
+_site_by_site_id_cache_lock = threading.Lock()
+
+# Column names copied from ORM rows into SiteSchema without re-validation
+_SITE_COLUMNS = tuple(column.name for column in SiteModel.__table__.columns)
+
+
+def _to_schema(site: SiteModel, **extra) -> SiteSchema:
+    """Build SiteSchema from a trusted DB row, skipping pydantic validation."""
+    values = {name: getattr(site, name) for name in _SITE_COLUMNS}
+    values.update(extra)
+    return SiteSchema.model_construct(**values)
+
 
 class SiteService:
     """Service for site operations."""
@@ -37,56 +69,47 @@ class SiteService:
         """Get all sites for a user with statistics."""
         from app.services.tracking_service import TrackingEventService
         
-        query = self.db.query(SiteModel).filter(SiteModel.user_id == user_id)
-        
-        if not include_deleted:
-            query = query.filter(SiteModel.is_active == True)
-        
-        sites = query.all()
+        query = _SITES_BY_USER if include_deleted else _ACTIVE_SITES_BY_USER
+        sites = self.db.scalars(query, {'user_id': user_id}).all()
         tracking_service = TrackingEventService(self.db)
         
+        # Get event counts for the last 30 days for all sites in one query
+        event_counts = tracking_service.get_sites_event_counts([site.site_id for site in sites], 30)
+        
         # Add statistics to each site
         sites_with_stats = []
         for site in sites:
-            site_dict = SiteSchema.from_orm(site).dict()
-            
-            # Get statistics for the last 30 days
-            stats = tracking_service.get_site_stats(site.site_id, 30)
-            
-            site_dict.update({
-                'total_events': stats['total_events'],
-                'ai_bot_events': stats['ai_bot_events'],
-                'human_events': stats['human_events'],
-                'ai_bot_percentage': stats['ai_bot_percentage']
-            })
-            
-            sites_with_stats.append(SiteSchema(**site_dict))
+            # All stored events are AI bot events
+            total_events = event_counts.get(site.site_id, 0)
+            sites_with_stats.append(_to_schema(
+                site,
+                total_events=total_events,
+                ai_bot_events=total_events,
+                human_events=0,
+                ai_bot_percentage=100.0
+            ))
         
         return sites_with_stats
     
     def get_site(self, site_id: int, user_id: int) -> Optional[SiteSchema]:
         """Get site by ID for specific user."""
-        site = self.db.query(SiteModel).filter(
-            and_(SiteModel.id == site_id, SiteModel.user_id == user_id)
-        ).first()
+        site = self.db.scalars(_USER_SITE_BY_ID, {'id': site_id, 'user_id': user_id}).first()
         
         if site:
-            return SiteSchema.from_orm(site)
+            return _to_schema(site)
         return None
     
     def get_site_by_id(self, site_id: int) -> Optional[SiteSchema]:
         """Get site by ID (public for tracking endpoints)."""
-        site = self.db.query(SiteModel).filter(SiteModel.id == site_id).first()
+        site = self.db.scalars(_SITE_BY_ID, {'id': site_id}).first()
         
         if site:
-            return SiteSchema.from_orm(site)
+            return _to_schema(site)
         return None
     
     def update_site(self, site_id: int, site_data: SiteUpdate, user_id: int) -> Optional[SiteSchema]:
         """Update site."""
-        site = self.db.query(SiteModel).filter(
-            and_(SiteModel.id == site_id, SiteModel.user_id == user_id, SiteModel.is_active == True)
-        ).first()
+        site = self.db.scalars(_ACTIVE_USER_SITE_BY_ID, {'id': site_id, 'user_id': user_id}).first()
         
         if not site:
             return None
@@ -99,14 +122,13 @@ class SiteService:
         
         self.db.commit()
         self.db.refresh(site)
+        self._invalidate_site_cache(site.site_id)
         
         return SiteSchema.from_orm(site)
     
     def soft_delete_site(self, site_id: int, user_id: int) -> bool:
         """Soft delete site (mark as inactive and set deleted_at)."""
-        site = self.db.query(SiteModel).filter(
-            and_(SiteModel.id == site_id, SiteModel.user_id == user_id, SiteModel.is_active == True)
-        ).first()
+        site = self.db.scalars(_ACTIVE_USER_SITE_BY_ID, {'id': site_id, 'user_id': user_id}).first()
         
         if not site:
             return False
@@ -115,20 +137,31 @@ class SiteService:
         site.deleted_at = func.now()
         
         self.db.commit()
+        self._invalidate_site_cache(site.site_id)
         return True
     
     def count_user_sites(self, user_id: int) -> int:
         """Count active sites for user."""
-        return self.db.query(SiteModel).filter(
-            and_(SiteModel.user_id == user_id, SiteModel.is_active == True)
-        ).count()
+        return self.db.scalar(_COUNT_ACTIVE_USER_SITES, {'user_id': user_id})
     
     def get_site_by_site_id(self, site_id: str) -> Optional[SiteSchema]:
         """Get site by site_id (for JS snippet)."""
-        site = self.db.query(SiteModel).filter(
-            and_(SiteModel.site_id == site_id, SiteModel.is_active == True)
-        ).first()
+        with _site_by_site_id_cache_lock:
+            cached_site = _site_by_site_id_cache.get(site_id)
+        if cached_site is not None:
+            return cached_site
+        
+        site = self.db.scalars(_ACTIVE_SITE_BY_SITE_ID, {'site_id': site_id}).first()
         
         if site:
-            return SiteSchema.from_orm(site)
+            site_schema = _to_schema(site)
+            with _site_by_site_id_cache_lock:
+                _site_by_site_id_cache[site_id] = site_schema
+            return site_schema
         return None
+    
+    @staticmethod
+    def _invalidate_site_cache(site_id: str):
+        """Drop a site from this process's site_id lookup cache after it changed."""
+        with _site_by_site_id_cache_lock:
+            _site_by_site_id_cache.pop(site_id, None)
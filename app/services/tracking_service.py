@@ -1,13 +1,224 @@
 """Tracking event service."""
 
-from typing import List, Optional, Dict, Any
+import copy
+import functools
+import hashlib
+import io
+import json
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Dict, Any, Tuple
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
-from datetime import datetime, timedelta
+from sqlalchemy import BigInteger, Date, DateTime, bindparam, cast, delete, func, desc, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from datetime import date, datetime, time as day_time, timedelta, timezone
 
-from app.models.tracking import TrackingEvent
+from app.models.tracking import TrackingEvent, SiteDailyUserAgent, TrackingEventDaily
 from app.models.site import Site
+from app.schemas.tracking import TrackingEventIn
 from app.services.ai_detection_service import AIBotDetectionService
+from app.utils.logging import log_info
+
+# Latest-events statements built once at import; parameters are bound per call
+_SITE_EVENTS = select(TrackingEvent).where(TrackingEvent.site_id == bindparam('site_id'))
+_SITE_BOT_EVENTS = _SITE_EVENTS.where(TrackingEvent.is_ai_bot == bindparam('bot_type'))
+_SITE_TYPE_EVENTS = _SITE_EVENTS.where(TrackingEvent.event_type == bindparam('event_type'))
+_SITE_TYPE_BOT_EVENTS = _SITE_TYPE_EVENTS.where(TrackingEvent.is_ai_bot == bindparam('bot_type'))
+
+_LATEST_SITE_EVENTS = _SITE_EVENTS.order_by(desc(TrackingEvent.timestamp), desc(TrackingEvent.id)).limit(bindparam('limit'))
+_LATEST_SITE_BOT_EVENTS = _SITE_BOT_EVENTS.order_by(desc(TrackingEvent.timestamp), desc(TrackingEvent.id)).limit(bindparam('limit'))
+_LATEST_SITE_TYPE_EVENTS = _SITE_TYPE_EVENTS.order_by(desc(TrackingEvent.timestamp), desc(TrackingEvent.id)).limit(bindparam('limit'))
+_LATEST_SITE_TYPE_BOT_EVENTS = _SITE_TYPE_BOT_EVENTS.order_by(desc(TrackingEvent.timestamp), desc(TrackingEvent.id)).limit(bindparam('limit'))
+
+# Keyset pagination: events strictly older than the (timestamp, id) cursor of the previous page
+_BEFORE_CURSOR = tuple_(TrackingEvent.timestamp, TrackingEvent.id) < tuple_(
+    bindparam('before_timestamp'), bindparam('before_id')
+)
+
+# Tracking events waiting for the background writer; each item is the list of
+# rows of one request, so a batch is queued (or rejected) as a whole
+EVENT_QUEUE: "queue.Queue[List[Dict[str, Any]]]" = queue.Queue(maxsize=10_000)
+
+# Set while the scheduler's event writer drains EVENT_QUEUE; without it events are written inline
+event_writer_active = threading.Event()
+
+# Held to check event_writer_active and queue rows as one step, and by the writer to clear
+# the flag; once it is cleared no more rows are queued, so the writer's last drain gets them all
+event_queue_lock = threading.Lock()
+
+
+def drain_event_queue(max_rows: int = 500, wait: float = 0.05) -> List[Dict[str, Any]]:
+    """Take queued rows: wait up to 1 s for the first item, then up to `wait` s to fill the batch."""
+    try:
+        rows = list(EVENT_QUEUE.get(timeout=1))
+    except queue.Empty:
+        return []
+    
+    deadline = time.monotonic() + wait
+    while len(rows) < max_rows:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            rows.extend(EVENT_QUEUE.get(timeout=remaining))
+        except queue.Empty:
+            break
+    
+    return rows
+
+
+# Dashboard stats per (method, site_id, days), shared by all requests of the process.
+# Every stats window includes today, so entries live only briefly: new events show
+# up within a minute, and workers (each with its own cache) differ by at most that
+_stats_cache = TTLCache(maxsize=10_000, ttl=60)
+_stats_cache_lock = threading.Lock()
+
+
+def _cached_stats(method):
+    """Serve a (site_id, days) stats method from _stats_cache, querying only on a miss.
+    
+    Callers get their own copy, so changing a result cannot alter the cached one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, site_id: str, days: int = 30):
+        cache_key = (method.__name__, site_id, days)
+        with _stats_cache_lock:
+            cached_result = _stats_cache.get(cache_key)
+        if cached_result is not None:
+            return copy.deepcopy(cached_result)
+        
+        result = method(self, site_id, days)
+        
+        with _stats_cache_lock:
+            _stats_cache[cache_key] = result
+        
+        return copy.deepcopy(result)
+    
+    return wrapper
+
+
+def _user_agent_hash(user_agent: str) -> int:
+    """First 8 bytes of the User-Agent's MD5 as a signed bigint.
+    
+    Same value as ('x' || substr(md5(user_agent), 1, 16))::bit(64)::bigint in PostgreSQL.
+    """
+    return int.from_bytes(hashlib.md5(user_agent.encode('utf-8')).digest()[:8], 'big', signed=True)
+
+
+# Text-format COPY escapes; NULL is written as \N
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# Same compact JSON as the engine's json_serializer
+_dump_json = functools.partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
+
+
+def _copy_value(value: Any) -> str:
+    """One column value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = _dump_json(value)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _period_start_day(days: int):
+    """SQL for the first UTC day of a `days`-long stats period, from the database clock."""
+    return cast(func.timezone('UTC', func.now()), Date) - days
+
+
+def _period_start(days: int):
+    """SQL for midnight UTC of the first day of a `days`-long stats period."""
+    return func.timezone('UTC', cast(_period_start_day(days), DateTime))
+
+
+# Monthly partitions of tracking_events, named tracking_events_YYYYMM
+_MONTHLY_PARTITION_RE = re.compile(r'tracking_events_(\d{4})(\d{2})')
+
+# Advisory lock held while partitions are created, so workers starting together do not collide
+_PARTITION_LOCK_KEY = 0x7472_6163_6b65_76  # 'trackev'
+
+# Client timestamps later than the receive time by more than this are replaced by it:
+# a clock running ahead must not date events in the future. Late timestamps are kept,
+# since the snippet resends events queued while offline with their original time
+_CLIENT_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _month_start(day: date) -> date:
+    """First day of the month of `day`."""
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    """First day of the month after `month` (a first of month)."""
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    """Timestamp as aware UTC (naive timestamps are taken as UTC).
+    
+    COPY would read naive values in the session TimeZone, while the rollups
+    bucket them by UTC day; aware UTC keeps both on the same day and partition.
+    """
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def _utc_day(timestamp: datetime) -> date:
+    """UTC calendar day of an event timestamp (naive timestamps are taken as UTC)."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def create_event_partitions(connection, months_ahead: int = 2) -> None:
+    """Create the monthly tracking_events partitions from this month to `months_ahead` months ahead.
+    
+    Runs in the caller's transaction. Rows of a new month that already sit in the
+    default partition would make CREATE ... PARTITION OF fail, so the default
+    partition is detached, the rows are moved into the new partition and it is
+    attached again.
+    """
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': _PARTITION_LOCK_KEY})
+    
+    columns = ', '.join(column.name for column in TrackingEvent.__table__.columns)
+    month = _month_start(datetime.now(timezone.utc).date())
+    for _ in range(months_ahead + 1):
+        next_month = _next_month(month)
+        partition = f"tracking_events_{month:%Y%m}"
+        
+        if connection.scalar(text("SELECT to_regclass(:name)"), {'name': partition}) is None:
+            bounds = {
+                'start': datetime.combine(month, day_time.min, timezone.utc),
+                'end': datetime.combine(next_month, day_time.min, timezone.utc)
+            }
+            in_default = connection.scalar(text(
+                "SELECT EXISTS (SELECT 1 FROM tracking_events_default "
+                "WHERE timestamp >= :start AND timestamp < :end)"
+            ), bounds)
+            
+            if in_default:
+                connection.execute(text("ALTER TABLE tracking_events DETACH PARTITION tracking_events_default"))
+            connection.execute(text(
+                f"CREATE TABLE {partition} PARTITION OF tracking_events "
+                f"FOR VALUES FROM ('{month} 00:00:00+00') TO ('{next_month} 00:00:00+00')"
+            ))
+            if in_default:
+                moved = connection.execute(text(
+                    f"WITH moved AS (DELETE FROM tracking_events_default "
+                    f"WHERE timestamp >= :start AND timestamp < :end RETURNING {columns}) "
+                    f"INSERT INTO {partition} ({columns}) SELECT {columns} FROM moved"
+                ), bounds).rowcount
+                connection.execute(text("ALTER TABLE tracking_events ATTACH PARTITION tracking_events_default DEFAULT"))
+                log_info(f"Moved {moved} events from the default partition into {partition}")
+        
+        month = next_month
 
 
 class TrackingEventService:
@@ -16,14 +227,17 @@ class TrackingEventService:
     def __init__(self, db: Session):
         self.db = db
     
-    def create_tracking_event(self, event_data: Dict[str, Any], ip_address: str = None) -> Optional[TrackingEvent]:
-        """Create a new tracking event - only for AI bots."""
-        user_agent = event_data.get('user_agent')
+    def _build_event_row(self, event: TrackingEventIn, ip_address: str = None,
+                         received_at: datetime = None,
+                         detection: Optional[Tuple[Optional[str], Optional[str], str]] = None) -> Optional[Dict[str, Any]]:
+        """Build tracking event column values - only for AI bots."""
+        user_agent = event.user_agent
+        received_at = received_at or datetime.now(timezone.utc)
         
-        # Detect AI bot using comprehensive method (User-Agent + IP)
-        bot_category, bot_name, detection_method = AIBotDetectionService.detect_ai_bot_comprehensive(
-            user_agent, ip_address, self.db
-        )
+        # Detect AI bot using comprehensive method (User-Agent + IP), unless the caller already did
+        if detection is None:
+            detection = AIBotDetectionService.detect_ai_bot_comprehensive(user_agent, ip_address, self.db)
+        bot_category, bot_name, detection_method = detection
         
         # TEST MODE DISABLED: Only real AI bots are tracked
         # Uncomment the block below to enable test mode
@@ -36,120 +250,334 @@ class TrackingEventService:
         if not bot_category:
             return None
         
-        db_event = TrackingEvent(
-            site_id=event_data.get('site_id'),
-            event_type=event_data.get('event_type'),
-            url=event_data.get('url'),
-            path=event_data.get('path'),
-            title=event_data.get('title'),
-            referrer=event_data.get('referrer'),
-            user_agent=user_agent,
-            ip_address=ip_address,
-            screen_resolution=event_data.get('screen_resolution'),
-            viewport_size=event_data.get('viewport_size'),
-            language=event_data.get('language'),
-            timezone=event_data.get('timezone'),
-            event_data=event_data.get('data', {}),
-            is_ai_bot=bot_category,
-            bot_name=bot_name,
-            detection_method=detection_method,
-            timestamp=datetime.fromisoformat(event_data.get('timestamp', datetime.now().isoformat()))
-        )
+        return {
+            'site_id': event.site_id,
+            'event_type': event.event_type,
+            'url': event.url,
+            'path': event.path,
+            'title': event.title,
+            'referrer': event.referrer,
+            'user_agent': user_agent,
+            'ip_address': ip_address,
+            'screen_resolution': event.screen_resolution,
+            'viewport_size': event.viewport_size,
+            'language': event.language,
+            'timezone': event.timezone,
+            'event_data': event.data,
+            'is_ai_bot': bot_category,
+            'bot_name': bot_name,
+            'detection_method': detection_method,
+            'timestamp': self._event_timestamp(event.timestamp, received_at)
+        }
+    
+    @staticmethod
+    def _event_timestamp(client_timestamp: Optional[datetime], received_at: datetime) -> datetime:
+        """Event time as aware UTC: the client's, unless it is missing or ahead by more than the allowed skew."""
+        received_at = _as_utc(received_at)
+        if client_timestamp is None:
+            return received_at
         
-        self.db.add(db_event)
+        client_timestamp = _as_utc(client_timestamp)
+        if client_timestamp - received_at > _CLIENT_CLOCK_SKEW:
+            return received_at
+        return client_timestamp
+    
+    def _build_event_rows(self, events: List[TrackingEventIn], ip_address: str = None) -> List[Dict[str, Any]]:
+        """Build the rows of one ingest request - only for AI bots.
+        
+        All events of a request share its IP and nearly always its User-Agent,
+        so detection runs once per distinct User-Agent of the batch.
+        """
+        rows: List[Dict[str, Any]] = []
+        received_at: datetime = datetime.now(timezone.utc)
+        detections: Dict[Optional[str], Tuple[Optional[str], Optional[str], str]] = {}
+        build_event_row = self._build_event_row
+        for event in events:
+            user_agent = event.user_agent
+            detection = detections.get(user_agent)
+            if detection is None:
+                detection = detections[user_agent] = AIBotDetectionService.detect_ai_bot_comprehensive(
+                    user_agent, ip_address, self.db
+                )
+            
+            row = build_event_row(event, ip_address, received_at, detection)
+            if row is not None:
+                rows.append(row)
+        
+        return rows
+    
+    def create_tracking_event(self, event: TrackingEventIn, ip_address: str = None) -> Optional[TrackingEvent]:
+        """Create a new tracking event - only for AI bots."""
+        row = self._build_event_row(event, ip_address)
+        if row is None:
+            return None
+        
+        # INSERT ... RETURNING loads the new event, server defaults included, in one round trip
+        db_event = self.db.execute(
+            insert(TrackingEvent).values(**row).returning(TrackingEvent)
+        ).scalar_one()
+        self._record_user_agents([row])
+        self._record_daily_counts([row])
         self.db.commit()
-        self.db.refresh(db_event)
         
         return db_event
     
-    def create_batch_tracking_events(self, events_data: List[Dict[str, Any]], ip_address: str = None) -> List[TrackingEvent]:
-        """Create multiple tracking events from batch data - only for AI bots."""
-        events = []
+    def create_batch_tracking_events(self, events: List[TrackingEventIn], ip_address: str = None) -> List[Dict[str, Any]]:
+        """Create multiple tracking events from batch data - only for AI bots.
+        
+        Rows are written with one COPY and returned as plain dicts
+        (no per-event refresh round trip).
+        """
+        rows = self._build_event_rows(events, ip_address)
+        
+        self.ingest_batch(rows)
+        
+        return rows
+    
+    def enqueue_tracking_events(self, events: List[TrackingEventIn], ip_address: str = None) -> List[Dict[str, Any]]:
+        """Detect AI bot events and hand them to the background writer.
+        
+        The request does not wait for the database; returns the accepted rows.
+        Raises queue.Full when the writer is too far behind (callers answer 429).
+        """
+        rows = self._build_event_rows(events, ip_address)
+        if not rows:
+            return rows
+        
+        with event_queue_lock:
+            if event_writer_active.is_set():
+                EVENT_QUEUE.put_nowait(rows)
+                return rows
+        
+        # No writer running: write inline, as create_batch_tracking_events does
+        self.ingest_batch(rows)
+        return rows
+    
+    def ingest_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """Load built event rows with one COPY and commit, together with the rollups.
+        
+        No ORM instances are built; callers that need the created event use
+        create_tracking_event. Returns the number of written rows.
+        """
+        if not rows:
+            return 0
+        
+        self._copy_event_rows(rows)
+        self._record_user_agents(rows)
+        self._record_daily_counts(rows)
+        self.db.commit()
+        
+        return len(rows)
+    
+    def _copy_event_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """Stream rows into tracking_events with COPY FROM STDIN.
         
-        for event_data in events_data:
-            event = self.create_tracking_event(event_data, ip_address)
-            if event:
-                events.append(event)
+        Runs on the session's connection, so it commits or rolls back with the
+        rollup upserts. Ids and created_at come from the column defaults.
+        """
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join([_copy_value(row[column]) for column in columns]))
+            buffer.write('\n')
+        buffer.seek(0)
+        
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {TrackingEvent.__tablename__} ({', '.join(columns)}) FROM STDIN",
+                buffer
+            )
+        finally:
+            cursor.close()
+    
+    def _record_user_agents(self, rows: List[Dict[str, Any]]) -> None:
+        """Add the User-Agents of new events to the per-day distinct rollup."""
+        user_agents = {
+            (row['site_id'], _utc_day(row['timestamp']), _user_agent_hash(row['user_agent']))
+            for row in rows
+            if row['user_agent']
+        }
+        if not user_agents:
+            return
+        
+        self.db.execute(
+            insert(SiteDailyUserAgent).values([
+                {'site_id': site_id, 'day': day, 'user_agent_hash': user_agent_hash}
+                for site_id, day, user_agent_hash in user_agents
+            ]).on_conflict_do_nothing()
+        )
+    
+    def _record_daily_counts(self, rows: List[Dict[str, Any]]) -> None:
+        """Add new events to the per-day counts rollup."""
+        counts = Counter(
+            (row['site_id'], _utc_day(row['timestamp']), row['event_type'], row['is_ai_bot'])
+            for row in rows
+        )
+        if not counts:
+            return
         
-        return events
+        # Keys in a fixed order, so concurrent writers lock rollup rows in the same order
+        stmt = insert(TrackingEventDaily).values([
+            {'site_id': site_id, 'day': day, 'event_type': event_type, 'is_ai_bot': bot_type, 'count': count}
+            for (site_id, day, event_type, bot_type), count in sorted(counts.items())
+        ])
+        self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['site_id', 'day', 'event_type', 'is_ai_bot'],
+                set_={'count': TrackingEventDaily.count + stmt.excluded.count}
+            )
+        )
     
-    def get_site_events(self, site_id: str, limit: int = 100, bot_type: str = None) -> List[TrackingEvent]:
-        """Get events for a specific site - only AI bots."""
-        query = self.db.query(TrackingEvent).filter(TrackingEvent.site_id == site_id)
+    def get_site_events(self, site_id: str, limit: int = 100, bot_type: str = None,
+                        cursor: Optional[Tuple[datetime, int]] = None) -> Tuple[List[TrackingEvent], Optional[Tuple[datetime, int]]]:
+        """Get a page of events for a specific site - only AI bots.
+        
+        Returns the events and the cursor of the next page (None on the last page).
+        """
+        params = {'site_id': site_id, 'limit': limit}
+        query = _LATEST_SITE_EVENTS
         
         if bot_type:
-            query = query.filter(TrackingEvent.is_ai_bot == bot_type)
+            query = _LATEST_SITE_BOT_EVENTS
+            params['bot_type'] = bot_type
             
-        return query.order_by(desc(TrackingEvent.timestamp)).limit(limit).all()
+        return self._fetch_page(query, params, limit, cursor)
     
-    def get_site_events_by_type(self, site_id: str, event_type: str, limit: int = 100, bot_type: str = None) -> List[TrackingEvent]:
-        """Get events of specific type for a site - only AI bots."""
-        query = self.db.query(TrackingEvent).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.event_type == event_type)
-        )
+    def get_site_events_by_type(self, site_id: str, event_type: str, limit: int = 100, bot_type: str = None,
+                                cursor: Optional[Tuple[datetime, int]] = None) -> Tuple[List[TrackingEvent], Optional[Tuple[datetime, int]]]:
+        """Get a page of events of specific type for a site - only AI bots.
+        
+        Returns the events and the cursor of the next page (None on the last page).
+        """
+        params = {'site_id': site_id, 'event_type': event_type, 'limit': limit}
+        query = _LATEST_SITE_TYPE_EVENTS
         
         if bot_type:
-            query = query.filter(TrackingEvent.is_ai_bot == bot_type)
-
+            query = _LATEST_SITE_TYPE_BOT_EVENTS
+            params['bot_type'] = bot_type
             
-        return query.order_by(desc(TrackingEvent.timestamp)).limit(limit).all()
+        return self._fetch_page(query, params, limit, cursor)
+    
+    def _fetch_page(self, query, params: Dict[str, Any], limit: int,
+                    cursor: Optional[Tuple[datetime, int]]) -> Tuple[List[TrackingEvent], Optional[Tuple[datetime, int]]]:
+        """Run a latest-events query from the cursor on and build the next page cursor."""
+        if cursor:
+            query = query.where(_BEFORE_CURSOR)
+            params['before_timestamp'], params['before_id'] = cursor
+        
+        events = self.db.scalars(query, params).all()
+        
+        next_cursor = None
+        if len(events) == limit:
+            next_cursor = (events[-1].timestamp, events[-1].id)
+        
+        return events, next_cursor
     
+    @_cached_stats
     def get_site_stats(self, site_id: str, days: int = 30) -> Dict[str, Any]:
         """Get statistics for a site - only AI bots."""
-        since_date = datetime.now() - timedelta(days=days)
-        
-        # All events are AI bot events now
-        total_events = self.db.query(TrackingEvent).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).count()
-        
-        # Events by type
-        events_by_type = self.db.query(
-            TrackingEvent.event_type,
-            func.count(TrackingEvent.id).label('count')
-        ).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).group_by(TrackingEvent.event_type).all()
-        
-        # Bot types distribution
-        bot_types = self.db.query(
-            TrackingEvent.is_ai_bot,
-            func.count(TrackingEvent.id).label('count')
-        ).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).group_by(TrackingEvent.is_ai_bot).all()
-        
-        # Unique bot visitors (by user_agent - simplified)
-        unique_bots = self.db.query(func.count(func.distinct(TrackingEvent.user_agent))).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).scalar()
+        since_date = _period_start(days)
+        
+        # Unique bot visitors (by user_agent - simplified), from the per-day
+        # rollup over the days of the period instead of every event
+        unique_bots = select(func.count(func.distinct(SiteDailyUserAgent.user_agent_hash))).where(
+            SiteDailyUserAgent.site_id == site_id, SiteDailyUserAgent.day >= _period_start_day(days)
+        ).scalar_subquery()
+        
+        # One round trip and one scan of the site's time range yield every aggregate:
+        # grouping set () gives the totals, the others the per-type breakdowns; the
+        # uncorrelated visitors subquery is evaluated once and repeated on every row
+        rows = self.db.execute(
+            select(
+                TrackingEvent.event_type,
+                TrackingEvent.is_ai_bot,
+                func.grouping(TrackingEvent.event_type).label('by_type'),
+                func.grouping(TrackingEvent.is_ai_bot).label('by_bot'),
+                func.count(TrackingEvent.id).label('count'),
+                unique_bots.label('unique_bots')
+            ).where(
+                TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date
+            ).group_by(
+                func.grouping_sets(
+                    text('()'),
+                    tuple_(TrackingEvent.event_type),
+                    tuple_(TrackingEvent.is_ai_bot)
+                )
+            )
+        ).all()
+        
+        total_events = 0
+        unique_visitors = 0
+        events_by_type = {}
+        bot_types = {}
+        for event_type, bot_type, by_type, by_bot, count, unique_visitors in rows:
+            if by_type and by_bot:
+                # All events are AI bot events now
+                total_events = count
+            elif not by_type:
+                events_by_type[event_type] = count
+            else:
+                bot_types[bot_type] = count
         
         return {
             'total_events': total_events,
             'ai_bot_events': total_events,  # All events are AI bot events
             'human_events': 0,  # No human events stored
             'ai_bot_percentage': 100.0,  # All events are AI bots
-            'events_by_type': {event_type: count for event_type, count in events_by_type},
-            'bot_types': {bot_type: count for bot_type, count in bot_types},
-            'unique_visitors': unique_bots,
+            'events_by_type': events_by_type,
+            'bot_types': bot_types,
+            'unique_visitors': unique_visitors,
             'period_days': days
         }
     
+    def get_sites_event_counts(self, site_ids: List[str], days: int = 30) -> Dict[str, int]:
+        """Get event counts for several sites in a single grouped query."""
+        if not site_ids:
+            return {}
+        
+        since_date = _period_start(days)
+        
+        # IN renders as an expanding parameter, so any number of sites shares one cached statement
+        counts = self.db.execute(
+            select(
+                TrackingEvent.site_id,
+                func.count(TrackingEvent.id).label('count')
+            ).where(
+                TrackingEvent.site_id.in_(site_ids), TrackingEvent.timestamp >= since_date
+            ).group_by(TrackingEvent.site_id)
+        ).all()
+        
+        return {site_id: count for site_id, count in counts}
+    
     def count_site_events(self, site_id: str) -> int:
         """Count total events for a site."""
-        return self.db.query(TrackingEvent).filter(TrackingEvent.site_id == site_id).count()
+        return self.db.scalar(
+            select(func.count(TrackingEvent.id)).where(TrackingEvent.site_id == site_id)
+        )
     
+    def _daily_counts(self, site_id: str, days: int, by_bot_type: bool = False) -> List[Tuple]:
+        """Get (day[, bot_type], count) rows for a site from the daily counts rollup."""
+        since_day = _period_start_day(days)
+        
+        columns = [TrackingEventDaily.day]
+        if by_bot_type:
+            columns.append(TrackingEventDaily.is_ai_bot)
+        
+        return self.db.execute(
+            select(
+                *columns, cast(func.sum(TrackingEventDaily.count), BigInteger)
+            ).where(
+                TrackingEventDaily.site_id == site_id,
+                TrackingEventDaily.day >= since_day
+            ).group_by(*columns)
+        ).all()
+    
+    @_cached_stats
     def get_daily_stats(self, site_id: str, days: int = 30) -> Dict[str, Any]:
         """Get daily statistics for a site - only AI bots."""
-        since_date = datetime.now() - timedelta(days=days)
-        
         # Daily AI bot events
-        daily_ai_bot_events = self.db.query(
-            func.date(TrackingEvent.timestamp).label('date'),
-            func.count(TrackingEvent.id).label('ai_bot_events')
-        ).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).group_by(func.date(TrackingEvent.timestamp)).all()
+        daily_ai_bot_events = sorted(self._daily_counts(site_id, days))
         
         # Convert to list of dictionaries
         daily_stats = []
@@ -163,54 +591,72 @@ class TrackingEventService:
         
         return daily_stats
     
+    @_cached_stats
     def get_bot_types_stats(self, site_id: str, days: int = 30) -> Dict[str, Any]:
         """Get bot types statistics for a site."""
-        since_date = datetime.now() - timedelta(days=days)
-        
-        # Bot types distribution
-        bot_types = self.db.query(
-            TrackingEvent.is_ai_bot,
-            func.count(TrackingEvent.id).label('count')
-        ).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).group_by(TrackingEvent.is_ai_bot).all()
-        
-        # Daily bot types distribution
-        daily_bot_types = self.db.query(
-            func.date(TrackingEvent.timestamp).label('date'),
-            TrackingEvent.is_ai_bot,
-            func.count(TrackingEvent.id).label('count')
-        ).filter(
-            and_(TrackingEvent.site_id == site_id, TrackingEvent.timestamp >= since_date)
-        ).group_by(func.date(TrackingEvent.timestamp), TrackingEvent.is_ai_bot).all()
+        # Daily bot types distribution; the period totals are summed from it
+        daily_bot_types = self._daily_counts(site_id, days, by_bot_type=True)
         
         # Convert daily bot types to dictionary format
+        bot_types = {}
         daily_bot_types_dict = {}
-        for date, bot_type, count in daily_bot_types:
+        for date, bot_type, count in sorted(daily_bot_types, key=lambda row: row[0]):
             date_str = date.isoformat()
             if date_str not in daily_bot_types_dict:
                 daily_bot_types_dict[date_str] = {}
             daily_bot_types_dict[date_str][bot_type] = count
+            bot_types[bot_type] = bot_types.get(bot_type, 0) + count
         
         return {
-            'bot_types': {bot_type: count for bot_type, count in bot_types},
+            'bot_types': bot_types,
             'daily_bot_types': daily_bot_types_dict,
             'period_days': days
         }
     
     def get_recent_events(self, site_id: str, limit: int = 10) -> List[TrackingEvent]:
         """Get recent events for a site - only AI bots."""
-        return self.db.query(TrackingEvent).filter(
-            TrackingEvent.site_id == site_id
-        ).order_by(desc(TrackingEvent.timestamp)).limit(limit).all()
+        return self.db.scalars(_LATEST_SITE_EVENTS, {'site_id': site_id, 'limit': limit}).all()
+    
+    def ensure_event_partitions(self, months_ahead: int = 2) -> None:
+        """Create the monthly tracking_events partitions from this month to `months_ahead` months ahead."""
+        create_event_partitions(self.db.connection(), months_ahead)
+        self.db.commit()
     
     def delete_old_events(self, days: int = 90) -> int:
-        """Delete events older than specified days."""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        """Delete events older than specified days.
+        
+        Monthly partitions that end before the cutoff are dropped whole; the rest
+        of the expired events (cutoff month, default partition) are deleted, and
+        so are the daily rollup rows of the expired days, in the same transaction.
+        Returns the number of deleted rows, not counting dropped partitions.
+        """
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        cutoff_day = _utc_day(cutoff_date)
+        
+        partitions = self.db.scalars(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = 'tracking_events'"
+        )).all()
         
-        deleted_count = self.db.query(TrackingEvent).filter(
-            TrackingEvent.timestamp < cutoff_date
-        ).delete()
+        dropped = []
+        for partition in partitions:
+            match = _MONTHLY_PARTITION_RE.fullmatch(partition)
+            if match and _next_month(date(int(match[1]), int(match[2]), 1)) <= cutoff_day:
+                self.db.execute(text(f"DROP TABLE {partition}"))
+                dropped.append(partition)
+        
+        deleted_count = self.db.execute(
+            delete(TrackingEvent).where(TrackingEvent.timestamp < cutoff_date)
+        ).rowcount
+        
+        # Days before the cutoff day have no events left; the cutoff day keeps its counts
+        self.db.execute(delete(TrackingEventDaily).where(TrackingEventDaily.day < cutoff_day))
+        self.db.execute(delete(SiteDailyUserAgent).where(SiteDailyUserAgent.day < cutoff_day))
         
         self.db.commit()
-        return deleted_count
\ No newline at end of file
+        
+        if dropped:
+            log_info(f"Dropped expired event partitions: {', '.join(sorted(dropped))}")
+        return deleted_count
@@ -1,11 +1,55 @@
 """Logging configuration for the application."""
 
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import time
 from pathlib import Path
 
 
+class _DailyFileHandler(logging.FileHandler):
+    """Append to <name>_YYYYMMDD.log, switching files when a record's UTC day changes.
+    
+    Files are never renamed, so all worker processes can append to the same one
+    (a rotating handler per worker would race on the midnight rename).
+    """
+    
+    def __init__(self, logs_dir: Path, name: str):
+        self.logs_dir = logs_dir
+        self.name_prefix = name
+        self.day = time.strftime('%Y%m%d', time.gmtime())
+        super().__init__(self._path(self.day), encoding='utf-8', delay=True)
+    
+    def _path(self, day: str) -> Path:
+        return self.logs_dir / f"{self.name_prefix}_{day}.log"
+    
+    def emit(self, record: logging.LogRecord):
+        day = time.strftime('%Y%m%d', time.gmtime(record.created))
+        if day != self.day:
+            # Called with the handler lock held; the next write opens the new day's file
+            self.day = day
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(self._path(day))
+        super().emit(record)
+
+
+def _queued(handler: logging.Handler) -> logging.handlers.QueueHandler:
+    """Put records on a queue that a background listener writes to `handler`.
+    
+    The logging thread only enqueues; file writes happen on the listener thread.
+    """
+    records = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    # Stop before logging's own shutdown hook, so queued records still reach the files
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(records)
+
+
 def setup_logging():
     """Setup logging configuration."""
     
@@ -24,15 +68,16 @@ def setup_logging():
         datefmt=date_format,
         handlers=[
             # Console handler
-            logging.StreamHandler(),
-            # File handler for all logs
-            logging.FileHandler(
-                logs_dir / f"app_{datetime.now().strftime('%Y%m%d')}.log",
-                encoding='utf-8'
-            )
+            logging.StreamHandler()
         ]
     )
     
+    # File handler for all logs (added after basicConfig, which would set
+    # its formatter on the queue handler and format every record twice)
+    app_handler = _DailyFileHandler(logs_dir, "app")
+    app_handler.setFormatter(logging.Formatter(log_format, date_format))
+    logging.getLogger().addHandler(_queued(app_handler))
+    
     # Configure specific loggers
     app_logger = logging.getLogger("app")
     app_logger.setLevel(logging.INFO)
@@ -42,34 +87,35 @@ def setup_logging():
     error_logger.setLevel(logging.ERROR)
     
     # Add file handler for errors only
-    error_handler = logging.FileHandler(
-        logs_dir / f"errors_{datetime.now().strftime('%Y%m%d')}.log",
-        encoding='utf-8'
-    )
+    error_handler = _DailyFileHandler(logs_dir, "errors")
     error_handler.setLevel(logging.ERROR)
     error_formatter = logging.Formatter(log_format, date_format)
     error_handler.setFormatter(error_formatter)
-    error_logger.addHandler(error_handler)
+    # Buffer error records in memory and write them to the file in batches:
+    # on flush_errors(), when the buffer is full, or at shutdown
+    buffered_error_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.CRITICAL,
+        target=error_handler
+    )
+    error_logger.addHandler(_queued(buffered_error_handler))
     
     # Tracking logger for tracking events
     tracking_logger = logging.getLogger("app.tracking")
     tracking_logger.setLevel(logging.INFO)
     
     # Add file handler for tracking events
-    tracking_handler = logging.FileHandler(
-        logs_dir / f"tracking_{datetime.now().strftime('%Y%m%d')}.log",
-        encoding='utf-8'
-    )
+    tracking_handler = _DailyFileHandler(logs_dir, "tracking")
     tracking_handler.setLevel(logging.INFO)
     tracking_formatter = logging.Formatter(log_format, date_format)
     tracking_handler.setFormatter(tracking_formatter)
-    tracking_logger.addHandler(tracking_handler)
+    tracking_logger.addHandler(_queued(tracking_handler))
     
-    return app_logger, error_logger, tracking_logger
+    return app_logger, error_logger, tracking_logger, buffered_error_handler
 
 
 # Initialize loggers
-app_logger, error_logger, tracking_logger = setup_logging()
+app_logger, error_logger, tracking_logger, _error_buffer = setup_logging()
 
 
 def log_error(error_message: str, error_details: str = None, user_id: int = None, site_id: str = None):
@@ -82,13 +128,30 @@ def log_error(error_message: str, error_details: str = None, user_id: int = None
     
     context_str = f" [{', '.join(context)}]" if context else ""
     
-    error_logger.error(f"{error_message}{context_str}")
+    error_logger.error("%s%s", error_message, context_str)
     if error_details:
-        error_logger.error(f"Details: {error_details}")
+        error_logger.error("Details: %s", error_details)
+
+
+def log_info(message: str, site_id: str = None):
+    """Log an informational message of the application, e.g. from a background job."""
+    if not app_logger.isEnabledFor(logging.INFO):
+        return
+    
+    context_str = f" [site_id={site_id}]" if site_id else ""
+    app_logger.info("%s%s", message, context_str)
+
+
+def flush_errors():
+    """Write buffered error records to the errors log file."""
+    _error_buffer.flush()
 
 
 def log_tracking_event(event_type: str, site_id: str, ip_address: str = None, user_agent: str = None, is_ai_bot: bool = None, bot_name: str = None):
     """Log a tracking event."""
+    if not tracking_logger.isEnabledFor(logging.INFO):
+        return
+    
     context = [f"event_type={event_type}", f"site_id={site_id}"]
     
     if ip_address:
@@ -100,12 +163,14 @@ def log_tracking_event(event_type: str, site_id: str, ip_address: str = None, us
     if bot_name:
         context.append(f"bot_name={bot_name}")
     
-    context_str = " | ".join(context)
-    tracking_logger.info(f"Tracking event: {context_str}")
+    tracking_logger.info("Tracking event: %s", " | ".join(context))
 
 
 def log_api_request(method: str, path: str, status_code: int, user_id: int = None, duration_ms: float = None):
     """Log an API request."""
+    if not app_logger.isEnabledFor(logging.INFO):
+        return
+    
     context = [f"method={method}", f"path={path}", f"status={status_code}"]
     
     if user_id:
@@ -113,5 +178,4 @@ def log_api_request(method: str, path: str, status_code: int, user_id: int = Non
     if duration_ms:
         context.append(f"duration={duration_ms:.2f}ms")
     
-    context_str = " | ".join(context)
-    app_logger.info(f"API request: {context_str}")
+    app_logger.info("API request: %s", " | ".join(context))
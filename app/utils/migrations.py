@@ -1,61 +1,41 @@
 """Database migration utilities."""
 
-import subprocess
-import sys
-import os
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
 from app.db.session import engine
 from app.db.base import Base
+from app.services.tracking_service import create_event_partitions
+
+# Backend root, where alembic.ini lives
+BACKEND_DIR = Path(__file__).resolve().parents[2]
 
 
 def run_migrations():
-    """Run database migrations using Alembic with fallback to manual creation."""
+    """Run database migrations using Alembic.
+    
+    Every worker runs this at startup; env.py serializes them with an advisory lock,
+    so later workers find the schema at head. Only non-PostgreSQL databases (local
+    SQLite) fall back to creating the tables from the models.
+    """
     try:
-        # Check if alembic is available
-        try:
-            subprocess.run([sys.executable, "-c", "import alembic"], 
-                         check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            print("⚠️ Alembic not available, trying to install...")
-            try:
-                # Try to install alembic
-                subprocess.run([sys.executable, "-m", "pip", "install", "alembic==1.13.1"], 
-                             check=True, capture_output=True)
-                print("✅ Alembic installed successfully")
-            except subprocess.CalledProcessError:
-                print("⚠️ Could not install Alembic, using manual table creation...")
-                Base.metadata.create_all(bind=engine)
-                print("✅ Tables created manually")
-                return True
-        
-        # Change to the backend directory
-        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        original_dir = os.getcwd()
-        os.chdir(backend_dir)
+        # Upgrade in-process on the app's engine instead of spawning `alembic upgrade head`
+        alembic_cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+        with engine.begin() as connection:
+            alembic_cfg.attributes["connection"] = connection
+            command.upgrade(alembic_cfg, "head")
         
-        try:
-            # Run alembic upgrade head
-            result = subprocess.run([
-                sys.executable, "-m", "alembic", "upgrade", "head"
-            ], capture_output=True, text=True, check=True)
-            
-            print("✅ Database migrations completed successfully")
-            return True
-            
-        finally:
-            # Always restore original directory
-            os.chdir(original_dir)
+        print("✅ Database migrations completed successfully")
+        return True
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Migration failed: {e}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
-        # Fallback to creating tables manually
-        print("🔄 Falling back to manual table creation...")
-        Base.metadata.create_all(bind=engine)
-        print("✅ Tables created manually (fallback)")
-        return False
     except Exception as e:
         print(f"❌ Migration error: {e}")
+        # create_all on a partly migrated PostgreSQL schema would leave it unversioned
+        if engine.dialect.name == 'postgresql':
+            raise
+        
         # Fallback to creating tables manually
         print("🔄 Falling back to manual table creation...")
         Base.metadata.create_all(bind=engine)
@@ -63,6 +43,19 @@ def run_migrations():
         return False
 
 
+def ensure_event_partitions():
+    """Create the current and upcoming monthly tracking_events partitions."""
+    if engine.dialect.name != 'postgresql':
+        return
+    
+    try:
+        with engine.begin() as connection:
+            create_event_partitions(connection)
+        print("✅ Event partitions ensured")
+    except Exception as e:
+        print(f"❌ Event partition error: {e}")
+
+
 def create_tables_manually():
     """Create all tables manually using SQLAlchemy metadata."""
     try:
@@ -1,15 +1,26 @@
 """Security utilities for authentication."""
 
+import hashlib
+import hmac
+import threading
 from datetime import datetime, timedelta
 from typing import Any, Union
 
 import jwt
-from argon2 import PasswordHasher
+from argon2 import PasswordHasher, Type
 from argon2.exceptions import VerifyMismatchError, InvalidHashError
+from cachetools import TTLCache
 
 from app.core.config import settings
 
-ph = PasswordHasher()
+# Argon2id with the OWASP minimum profile (19 MiB, 2 passes, 1 lane); hashes made
+# with other parameters keep verifying, since each hash records its own
+ph = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1, type=Type.ID)
+
+# Successful verifications of the last 5 minutes, keyed by an HMAC of hash and
+# password, so neither is kept in memory and a changed hash never matches
+_verified_cache = TTLCache(maxsize=50_000, ttl=300)
+_verified_cache_lock = threading.Lock()
 
 
 def create_access_token(
@@ -29,11 +40,23 @@ def create_access_token(
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password using Argon2."""
+    cache_key = hmac.new(
+        settings.SECRET_KEY.encode(),
+        f"{hashed_password}\0{plain_password}".encode(),
+        hashlib.sha256
+    ).digest()
+    with _verified_cache_lock:
+        if cache_key in _verified_cache:
+            return True
+    
     try:
         ph.verify(hashed_password, plain_password)
-        return True
     except (VerifyMismatchError, InvalidHashError):
         return False
+    
+    with _verified_cache_lock:
+        _verified_cache[cache_key] = True
+    return True
 
 
 def get_password_hash(password: str) -> str:
@@ -16,7 +16,7 @@ echo "📦 Installing dependencies..."
 pip install -r requirements.txt
 
 echo "🔄 Running database migration..."
-python migrate_add_site_name.py
+alembic upgrade head
 
 echo "🏗️ Starting application..."
 gunicorn app.main:app -w 4 -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000
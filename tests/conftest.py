@@ -15,6 +15,11 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def pytest_configure(config):
+    """Register custom markers."""
+    config.addinivalue_line("markers", "postgres: needs a PostgreSQL database (TEST_POSTGRES_URL)")
+
+
 @pytest.fixture
 def db():
     """Create test database."""
@@ -0,0 +1,36 @@
+"""Test AI bot detection by User-Agent."""
+
+import pytest
+
+from app.services.ai_detection_service import AIBotDetectionService
+
+
+@pytest.mark.parametrize("user_agent, expected", [
+    (
+        "Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko); compatible; GPTBot/1.2; +https://openai.com/gptbot",
+        ("ChatGPT", "GPTBot")
+    ),
+    (
+        "Mozilla/5.0 AppleWebKit/537.36 (KHTML, like Gecko); compatible; ChatGPT-User/1.0; +https://openai.com/bot",
+        ("ChatGPT", "ChatGPT-User")
+    ),
+    (
+        "Mozilla/5.0 (compatible; ClaudeBot/1.0; +claudebot@anthropic.com)",
+        ("Claude", "Anthropic")
+    ),
+    ("CCBot/2.0 (https://commoncrawl.org/faq/)", (None, None)),
+])
+def test_detect_ai_bot(user_agent, expected):
+    """Test common crawler User-Agents map to their category and pattern."""
+    assert AIBotDetectionService.detect_ai_bot(user_agent) == expected
+
+
+@pytest.mark.parametrize("user_agent, expected", [
+    # Earlier categories win when a User-Agent matches several
+    ("DeepSeekBot/1.0 (Anthropic-compatible)", ("DeepSeek", "DeepSeek")),
+    ("Mozilla/5.0 (compatible; Google-Extended) Perplexity", ("Gemini", "Google-Extended")),
+    ("Mozilla/5.0 (compatible; PerplexityBot/1.0) Claude", ("Claude", "Claude")),
+])
+def test_overlapping_user_agents_keep_category_precedence(user_agent, expected):
+    """Test the category of User-Agents matching patterns of several categories."""
+    assert AIBotDetectionService.detect_ai_bot(user_agent) == expected
@@ -0,0 +1,67 @@
+"""Test COPY text formatting of tracking event values."""
+
+import json
+import re
+from datetime import datetime, timezone
+
+from app.services.tracking_service import _copy_value
+
+COPY_UNESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r'}
+
+
+def copy_unescape(field):
+    """Read one COPY text field back the way PostgreSQL does."""
+    if field == '\\N':
+        return None
+    return re.sub(r'\\(.)', lambda match: COPY_UNESCAPES[match[1]], field)
+
+
+def test_none_is_null_marker():
+    """Test None is written as \\N."""
+    assert _copy_value(None) == '\\N'
+
+
+def test_literal_backslash_n_is_not_null():
+    """Test a literal backslash-N string is escaped, not read as NULL."""
+    assert _copy_value('\\N') == '\\\\N'
+    assert copy_unescape(_copy_value('\\N')) == '\\N'
+
+
+def test_control_characters_are_escaped():
+    """Test backslash, tab, newline and carriage return are escaped."""
+    assert _copy_value('a\\b') == 'a\\\\b'
+    assert _copy_value('a\tb') == 'a\\tb'
+    assert _copy_value('a\nb') == 'a\\nb'
+    assert _copy_value('a\rb') == 'a\\rb'
+
+
+def test_row_keeps_its_columns():
+    """Test a User-Agent and URL with tabs, newlines and backslashes stay in their columns."""
+    row = [
+        'Mozilla/5.0\t(GPTBot)\nInjected\\tcolumn',
+        'https://example.com/a\tb?q=\\n\r\n',
+        None,
+        'GPTBot'
+    ]
+    line = '\t'.join(_copy_value(value) for value in row)
+
+    assert '\n' not in line and '\r' not in line
+    fields = line.split('\t')
+    assert len(fields) == len(row)
+    assert [copy_unescape(field) for field in fields] == row
+
+
+def test_datetime_is_isoformat():
+    """Test timestamps keep their UTC offset."""
+    timestamp = datetime(2026, 10, 16, 23, 59, 59, tzinfo=timezone.utc)
+    assert _copy_value(timestamp) == '2026-10-16T23:59:59+00:00'
+
+
+def test_json_with_control_characters_round_trips():
+    """Test JSON event data with control characters and non-ASCII text survives COPY."""
+    data = {'text': 'tab\there\nline\\slash', 'name': 'Привет', 'items': [1, None]}
+    value = _copy_value(data)
+
+    assert '\t' not in value and '\n' not in value
+    assert json.loads(copy_unescape(value)) == data
+    assert 'Привет' in value
@@ -0,0 +1,74 @@
+"""Test keyset pagination of dashboard visits."""
+
+from datetime import datetime
+
+from app.api.deps import get_current_user
+from app.main import app
+from app.models.tracking import TrackingEvent
+from app.models.user import User
+from app.services.tracking_service import TrackingEventService
+
+
+def add_visits(db, timestamps):
+    """Store page views with ids 1..n at the given timestamps."""
+    for event_id, timestamp in enumerate(timestamps, start=1):
+        db.add(TrackingEvent(
+            id=event_id,
+            site_id="site_test",
+            event_type="page_view",
+            url=f"https://example.com/{event_id}",
+            is_ai_bot="GPTBot",
+            bot_name="GPTBot",
+            timestamp=timestamp
+        ))
+    db.commit()
+
+
+def read_all_pages(service, limit):
+    """Follow next cursors until the last page; returns the ids of every page."""
+    pages = []
+    cursor = None
+    while True:
+        events, cursor = service.get_site_events_by_type("site_test", "page_view", limit, cursor=cursor)
+        pages.append([event.id for event in events])
+        if cursor is None:
+            return pages
+
+
+def test_ties_on_timestamp_span_pages(db):
+    """Test visits sharing a timestamp across a page boundary are neither skipped nor repeated."""
+    older = datetime(2026, 10, 16, 11, 0, 0)
+    tied = datetime(2026, 10, 16, 12, 0, 0)
+    newer = datetime(2026, 10, 16, 13, 0, 0)
+    add_visits(db, [older, tied, tied, tied, newer])
+
+    pages = read_all_pages(TrackingEventService(db), limit=2)
+
+    assert pages == [[5, 4], [3, 2], [1]]
+
+
+def test_all_tied_timestamps(db):
+    """Test a page boundary inside a run of equal timestamps continues by id."""
+    tied = datetime(2026, 10, 16, 12, 0, 0)
+    add_visits(db, [tied] * 4)
+
+    pages = read_all_pages(TrackingEventService(db), limit=2)
+
+    # A full last page still returns a cursor; the page after it is empty
+    assert pages == [[4, 3], [2, 1], []]
+
+
+def test_half_cursor_is_rejected(client):
+    """Test before_timestamp or before_id alone is a bad request."""
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="user@example.com", username="user")
+    try:
+        response = client.get("/api/v1/dashboard/visits/site_test", params={"before_id": 5})
+        assert response.status_code == 400
+
+        response = client.get(
+            "/api/v1/dashboard/visits/site_test",
+            params={"before_timestamp": "2026-10-16T12:00:00+00:00"}
+        )
+        assert response.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,136 @@
+"""Test tracking_events partitions, retention and rollups on PostgreSQL.
+
+Runs against the database in TEST_POSTGRES_URL, which must be a throwaway
+database: the tables are created and dropped around every test.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.tracking import TrackingEvent, TrackingEventDaily, SiteDailyUserAgent
+from app.services.tracking_service import TrackingEventService, create_event_partitions
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+]
+
+
+@pytest.fixture
+def pg_db():
+    """Session on freshly created tables in the test PostgreSQL database."""
+    engine = create_engine(POSTGRES_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def event_row(timestamp, user_agent="GPTBot/1.2"):
+    """Column values of one AI bot page view, as built by TrackingEventService."""
+    return {
+        'site_id': 'site_test',
+        'event_type': 'page_view',
+        'url': 'https://example.com/',
+        'path': '/',
+        'title': None,
+        'referrer': None,
+        'user_agent': user_agent,
+        'ip_address': '192.0.2.1',
+        'screen_resolution': None,
+        'viewport_size': None,
+        'language': None,
+        'timezone': None,
+        'event_data': {},
+        'is_ai_bot': 'ChatGPT',
+        'bot_name': 'GPTBot',
+        'detection_method': 'user_agent',
+        'timestamp': timestamp
+    }
+
+
+def month_start(months_ahead):
+    """First day of the month `months_ahead` months from now (UTC)."""
+    month = datetime.now(timezone.utc).date().replace(day=1)
+    for _ in range(months_ahead):
+        month = (month + timedelta(days=32)).replace(day=1)
+    return month
+
+
+def partition_exists(db, name):
+    """Whether a table of that name exists."""
+    return db.scalar(text("SELECT to_regclass(:name)"), {'name': name}) is not None
+
+
+def count_rows(db, table):
+    """Number of rows in a table or partition."""
+    return db.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+def test_partitions_created_with_table(pg_db):
+    """Test this month's and the next two months' partitions exist right after create_all."""
+    for months_ahead in range(3):
+        assert partition_exists(pg_db, f"tracking_events_{month_start(months_ahead):%Y%m}")
+    assert partition_exists(pg_db, "tracking_events_default")
+
+
+def test_rows_in_default_move_into_new_partition(pg_db):
+    """Test a month whose rows already sit in the default partition can still get its partition."""
+    month = month_start(3)
+    partition = f"tracking_events_{month:%Y%m}"
+    timestamp = datetime.combine(month, datetime.min.time(), timezone.utc) + timedelta(days=1)
+    TrackingEventService(pg_db).ingest_batch([event_row(timestamp)])
+    assert count_rows(pg_db, "tracking_events_default") == 1
+
+    create_event_partitions(pg_db.connection(), months_ahead=3)
+    pg_db.commit()
+
+    assert count_rows(pg_db, partition) == 1
+    assert count_rows(pg_db, "tracking_events_default") == 0
+    # The default partition is attached again and still takes rows outside the partitions
+    TrackingEventService(pg_db).ingest_batch([event_row(timestamp + timedelta(days=400))])
+    assert count_rows(pg_db, "tracking_events_default") == 1
+
+
+def test_ingest_batch_maintains_rollups(pg_db):
+    """Test ingested rows are counted per day and their User-Agents recorded once per day."""
+    now = datetime.now(timezone.utc)
+    TrackingEventService(pg_db).ingest_batch([event_row(now), event_row(now)])
+    TrackingEventService(pg_db).ingest_batch([event_row(now, user_agent="ClaudeBot/1.0")])
+
+    assert pg_db.scalar(select(func.sum(TrackingEventDaily.count))) == 3
+    assert pg_db.scalar(select(func.count()).select_from(SiteDailyUserAgent)) == 2
+
+
+def test_delete_old_events_drops_partitions_and_rollups(pg_db):
+    """Test retention drops expired monthly partitions and prunes the rollups of expired days."""
+    pg_db.execute(text(
+        "CREATE TABLE tracking_events_202001 PARTITION OF tracking_events "
+        "FOR VALUES FROM ('2020-01-01 00:00:00+00') TO ('2020-02-01 00:00:00+00')"
+    ))
+    pg_db.commit()
+
+    service = TrackingEventService(pg_db)
+    now = datetime.now(timezone.utc)
+    service.ingest_batch([event_row(datetime(2020, 1, 15, tzinfo=timezone.utc)), event_row(now)])
+
+    deleted = service.delete_old_events(days=90)
+
+    # Rows of dropped partitions are not counted as deleted
+    assert deleted == 0
+    assert not partition_exists(pg_db, "tracking_events_202001")
+    assert pg_db.scalar(select(func.count()).select_from(TrackingEvent)) == 1
+    assert pg_db.scalar(select(func.min(TrackingEventDaily.day))) == now.date()
+    assert pg_db.scalar(select(func.min(SiteDailyUserAgent.day))) == now.date()
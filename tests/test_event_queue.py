@@ -0,0 +1,69 @@
+"""Test the hand-off of tracking events to the background writer."""
+
+import queue
+
+import pytest
+
+from app.services import tracking_service
+from app.services.tracking_service import TrackingEventService, drain_event_queue, event_writer_active
+
+ROWS = [{'site_id': 'site_test', 'event_type': 'page_view'}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Service with detection stubbed to accept every event and writes recorded."""
+    written = []
+    monkeypatch.setattr(tracking_service, 'EVENT_QUEUE', queue.Queue(maxsize=1))
+    monkeypatch.setattr(TrackingEventService, '_build_event_rows', lambda self, events, ip_address=None: ROWS)
+    monkeypatch.setattr(TrackingEventService, 'ingest_batch', lambda self, rows: written.append(rows) or len(rows))
+
+    event_writer_active.clear()
+    service = TrackingEventService(db=None)
+    service.written = written
+    yield service
+    event_writer_active.clear()
+
+
+def test_writes_inline_without_writer(service):
+    """Test events are written directly when no background writer runs."""
+    assert service.enqueue_tracking_events([], ip_address='192.0.2.1') == ROWS
+    assert service.written == [ROWS]
+    assert tracking_service.EVENT_QUEUE.empty()
+
+
+def test_queues_while_writer_runs(service):
+    """Test events are queued, not written, while the writer runs."""
+    event_writer_active.set()
+
+    assert service.enqueue_tracking_events([], ip_address='192.0.2.1') == ROWS
+    assert service.written == []
+    assert tracking_service.EVENT_QUEUE.get_nowait() == ROWS
+
+
+def test_full_queue_raises(service):
+    """Test a full queue is reported to the caller (answered with 429)."""
+    event_writer_active.set()
+    service.enqueue_tracking_events([], ip_address='192.0.2.1')
+
+    with pytest.raises(queue.Full):
+        service.enqueue_tracking_events([], ip_address='192.0.2.1')
+
+
+def test_nothing_written_for_ignored_events(service, monkeypatch):
+    """Test requests without AI bot events neither queue nor write anything."""
+    monkeypatch.setattr(TrackingEventService, '_build_event_rows', lambda self, events, ip_address=None: [])
+
+    assert service.enqueue_tracking_events([], ip_address='192.0.2.1') == []
+    assert service.written == []
+    assert tracking_service.EVENT_QUEUE.empty()
+
+
+def test_drain_joins_queued_requests(monkeypatch):
+    """Test the writer takes the rows of several queued requests as one batch."""
+    monkeypatch.setattr(tracking_service, 'EVENT_QUEUE', queue.Queue())
+    tracking_service.EVENT_QUEUE.put([{'id': 1}])
+    tracking_service.EVENT_QUEUE.put([{'id': 2}, {'id': 3}])
+
+    assert drain_event_queue(max_rows=500, wait=0.05) == [{'id': 1}, {'id': 2}, {'id': 3}]
+    assert tracking_service.EVENT_QUEUE.empty()
@@ -0,0 +1,98 @@
+"""Test in-memory AI bot IP prefix matching."""
+
+import time
+
+import pytest
+
+from app.models.ip_ranges import AIBotIPRange
+from app.services.ip_range_service import IPRangeService, _build_ip_index, _lookup_ip
+
+
+@pytest.fixture
+def ip_store(monkeypatch):
+    """Restore the shared in-memory IP store after the test."""
+    for name in ('_ai_bot_ips', '_ip_index', '_store_loaded', '_store_version', '_store_checked_at'):
+        monkeypatch.setattr(IPRangeService, name, getattr(IPRangeService, name))
+
+
+def test_exact_address_match():
+    """Test a single address matches only itself."""
+    ip_index = _build_ip_index({'GPTBot': {'203.0.113.5'}})
+    assert _lookup_ip(ip_index, '203.0.113.5') == 'GPTBot'
+    assert _lookup_ip(ip_index, '203.0.113.4') is None
+    assert _lookup_ip(ip_index, '203.0.113.6') is None
+
+
+def test_cidr_boundaries():
+    """Test the first and last addresses of a range match and its neighbours do not."""
+    ip_index = _build_ip_index({'SearchBot': {'192.0.2.0/24'}})
+    assert _lookup_ip(ip_index, '192.0.2.0') == 'SearchBot'
+    assert _lookup_ip(ip_index, '192.0.2.255') == 'SearchBot'
+    assert _lookup_ip(ip_index, '192.0.1.255') is None
+    assert _lookup_ip(ip_index, '192.0.3.0') is None
+
+
+def test_cidr_with_host_bits():
+    """Test a range written with host bits set covers its whole network."""
+    ip_index = _build_ip_index({'GPTBot': {'198.51.100.77/28'}})
+    assert _lookup_ip(ip_index, '198.51.100.64') == 'GPTBot'
+    assert _lookup_ip(ip_index, '198.51.100.79') == 'GPTBot'
+    assert _lookup_ip(ip_index, '198.51.100.80') is None
+
+
+def test_most_specific_prefix_wins():
+    """Test overlapping ranges resolve to the longest matching prefix."""
+    ip_index = _build_ip_index({
+        'Other AI': {'10.0.0.0/8'},
+        'SearchBot': {'10.1.0.0/16'},
+        'ChatGPT User': {'10.1.2.3'}
+    })
+    assert _lookup_ip(ip_index, '10.1.2.3') == 'ChatGPT User'
+    assert _lookup_ip(ip_index, '10.1.2.4') == 'SearchBot'
+    assert _lookup_ip(ip_index, '10.2.0.1') == 'Other AI'
+    assert _lookup_ip(ip_index, '11.0.0.1') is None
+
+
+def test_ipv6():
+    """Test IPv6 addresses match IPv6 ranges only and fall through otherwise."""
+    ip_index = _build_ip_index({'GPTBot': {'192.0.2.0/24', '2001:db8::/32'}})
+    assert _lookup_ip(ip_index, '2001:db8::1') == 'GPTBot'
+    assert _lookup_ip(ip_index, '2001:db9::1') is None
+    assert _lookup_ip(_build_ip_index({'GPTBot': {'192.0.2.0/24'}}), '::ffff:c000:201') is None
+
+
+def test_invalid_entries_are_skipped():
+    """Test invalid stored entries do not break the index."""
+    ip_index = _build_ip_index({'GPTBot': {'not-an-ip', '300.1.1.1/24', '192.0.2.1'}})
+    assert _lookup_ip(ip_index, '192.0.2.1') == 'GPTBot'
+
+
+def test_invalid_address_falls_through(db, ip_store):
+    """Test an invalid address raises in the matcher and is reported as not a bot."""
+    ip_index = _build_ip_index({'GPTBot': {'192.0.2.0/24'}})
+    with pytest.raises((OSError, ValueError)):
+        _lookup_ip(ip_index, 'not-an-ip')
+
+    service = IPRangeService(db)
+    assert service.is_ip_in_ai_bot_range('not-an-ip') == (False, None, None)
+    assert service.is_ip_in_ai_bot_range('') == (False, None, None)
+
+
+def test_store_reloads_after_changes(db, ip_store):
+    """Test stored ranges added later are picked up and bump the store generation."""
+    db.add(AIBotIPRange(bot_name='GPTBot', source_type='cidr', ip_address='198.51.100.0/24', is_active=True))
+    db.commit()
+
+    service = IPRangeService(db)
+    service.refresh()
+    generation = IPRangeService._store_generation
+    assert service.is_ip_in_ai_bot_range('198.51.100.7') == (True, 'GPTBot', 'direct_ip')
+    assert service.is_ip_in_ai_bot_range('203.0.113.9') == (False, None, None)
+
+    db.add(AIBotIPRange(bot_name='ChatGPT-User', source_type='direct_ip', ip_address='203.0.113.9', is_active=True))
+    db.commit()
+
+    # Let the next lookup check the stored version again
+    IPRangeService._store_checked_at = time.monotonic() - IPRangeService.STORE_CHECK_SECONDS - 1
+    assert service.is_ip_in_ai_bot_range('203.0.113.9') == (True, 'ChatGPT User', 'direct_ip')
+    assert IPRangeService._store_generation > generation